@@ -0,0 +1,186 @@
+import Lab1.des.key_schedule as key_schedule
+import Lab1.des.permutations as permutations
+import Lab1.des.tables as tables
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+BLOCK_SIZE = 8
+
+_tables = None
+
+
+def is_available():
+    """
+        Checks whether batch engine can be used
+
+    :return: True if numpy is installed
+    """
+    return numpy is not None
+
+
+def _get_tables():
+    global _tables
+
+    if _tables is None:
+        _tables = (
+            numpy.array(
+                permutations.initial_permutation.byte_tables,
+                dtype=numpy.uint64,
+            ),
+            numpy.array(
+                permutations.final_permutation.byte_tables, dtype=numpy.uint64
+            ),
+            numpy.array(tables.sp_boxes, dtype=numpy.uint64),
+        )
+
+    return _tables
+
+
+def _permute(blocks, byte_tables):
+    result = byte_tables[0][blocks & numpy.uint64(0xFF)]
+    for byte_index in range(1, len(byte_tables)):
+        result |= byte_tables[byte_index][
+            (blocks >> numpy.uint64(8 * byte_index)) & numpy.uint64(0xFF)
+        ]
+
+    return result
+
+
+def bytes_to_blocks(data):
+    """
+        Turns bytes into array of 64-bit blocks
+
+    :param data: bytes, length must be a multiple of 8
+    :return: numpy uint64 array
+    """
+    return numpy.frombuffer(data, dtype=">u8").astype(numpy.uint64)
+
+
+def blocks_to_bytes(blocks):
+    """
+        Turns array of 64-bit blocks into bytes
+
+    :param blocks: numpy uint64 array
+    :return: bytes
+    """
+    return blocks.astype(">u8").tobytes()
+
+
+def crypt_blocks(blocks, crypt_type, key):
+    """
+        Crypts all blocks at once. Every step of DES algorithm is applied to
+        the whole array, so interpreter overhead is paid per iteration and
+        not per block.
+
+    :param blocks: numpy uint64 array of blocks
+    :param crypt_type: ENCRYPT or DECRYPT
+    :param key: key as string, bytes or DESKey
+    :return: numpy uint64 array of crypted blocks
+    """
+    sub_keys = key_schedule.get_key(key).sub_keys(crypt_type)
+
+    return crypt_blocks_multiple(blocks, [sub_keys])
+
+
+def crypt_blocks_multiple(blocks, sub_keys_list):
+    """
+        Crypts all blocks with several DES passes in a row. Final and
+        initial permutations between passes cancel out and are skipped.
+
+    :param blocks: numpy uint64 array of blocks
+    :param sub_keys_list: keys for des iterations of every pass
+    :return: numpy uint64 array of crypted blocks
+    """
+    initial_permutation, final_permutation, sp_boxes = _get_tables()
+
+    mask_32 = numpy.uint64(0xFFFFFFFF)
+    mask_6 = numpy.uint64(0x3F)
+    one = numpy.uint64(1)
+    shifts = [numpy.uint64(shift) for shift in (28, 24, 20, 16, 12, 8, 4, 0)]
+
+    blocks = _permute(
+        numpy.asarray(blocks, dtype=numpy.uint64), initial_permutation
+    )
+
+    left_block = blocks >> numpy.uint64(32)
+    right_block = blocks & mask_32
+
+    for sub_keys in sub_keys_list:
+        for iteration_key in sub_keys:
+            r = (
+                ((right_block & one) << numpy.uint64(33))
+                | (right_block << one)
+                | (right_block >> numpy.uint64(31))
+            )
+
+            for j in range(8):
+                group_key = numpy.uint64(
+                    (iteration_key >> (42 - 6 * j)) & 0x3F
+                )
+                left_block ^= sp_boxes[j][
+                    ((r >> shifts[j]) & mask_6) ^ group_key
+                ]
+
+            left_block, right_block = right_block, left_block
+
+        left_block, right_block = right_block, left_block
+
+    blocks = (left_block << numpy.uint64(32)) | right_block
+
+    return _permute(blocks, final_permutation)
+
+
+def encrypt_blocks(blocks, key):
+    """
+        Encrypts array of blocks
+
+    :param blocks: numpy uint64 array of blocks
+    :param key: key to encrypt with
+    :return: numpy uint64 array of encrypted blocks
+    """
+    return crypt_blocks(blocks, key_schedule.ENCRYPT, key)
+
+
+def decrypt_blocks(blocks, key):
+    """
+        Decrypts array of blocks
+
+    :param blocks: numpy uint64 array of blocks
+    :param key: key to decrypt with
+    :return: numpy uint64 array of decrypted blocks
+    """
+    return crypt_blocks(blocks, key_schedule.DECRYPT, key)
+
+
+def crypt_into(data, out, crypt_type, key):
+    """
+        Crypts bytes in ECB mode with batch engine writing result into
+        passed buffer
+
+    :param data: bytes-like object, length must be a multiple of 8
+    :param out: writable bytes-like object of the same length, may be data
+    :param crypt_type: ENCRYPT or DECRYPT
+    :param key: key to crypt with
+    """
+    out_blocks = numpy.frombuffer(out, dtype=">u8")
+    out_blocks[:] = crypt_blocks(
+        numpy.frombuffer(data, dtype=">u8"), crypt_type, key
+    )
+
+
+def crypt(data, crypt_type, key):
+    """
+        Crypts bytes in ECB mode with batch engine
+
+    :param data: bytes, length must be a multiple of 8
+    :param crypt_type: ENCRYPT or DECRYPT
+    :param key: key to crypt with
+    :return: crypted bytes
+    """
+    return blocks_to_bytes(
+        crypt_blocks(bytes_to_blocks(data), crypt_type, key)
+    )
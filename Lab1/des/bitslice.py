@@ -0,0 +1,278 @@
+import Lab1.des.constants as constants
+import Lab1.des.key_schedule as key_schedule
+
+
+BLOCK_SIZE = 8
+
+# translation tables turning byte into "0" or "1" for each of its bits
+_BIT_TABLES = [
+    bytes(48 + ((value >> (7 - bit)) & 1) for value in range(256))
+    for bit in range(8)
+]
+
+# translation table turning "0" and "1" back into 0 and 1 bytes
+_DIGIT_TABLE = bytes(
+    value - 48 if value in (48, 49) else 0 for value in range(256)
+)
+
+
+def build_s_box_source(s_box, name):
+    """
+        Builds boolean gates network for S-box. Every output bit is expanded
+        by input bits into multiplexers, equal sub functions are computed once.
+
+    :param s_box: S-box from constants
+    :param name: name of generated function
+    :return: source of function taking six lanes and mask and returning
+        four lanes
+    """
+    variables = ["x0", "x1", "x2", "x3", "x4", "x5"]
+    lines = []
+    nodes = {}
+
+    def node(truth, depth):
+        size = 1 << (6 - depth)
+        full = (1 << size) - 1
+
+        if truth == 0:
+            return "0"
+        if truth == full:
+            return "mask"
+        if (truth, depth) in nodes:
+            return nodes[(truth, depth)]
+
+        half = size // 2
+        low = truth & ((1 << half) - 1)
+        high = truth >> half
+        variable = variables[depth]
+
+        if low == high:
+            return node(low, depth + 1)
+
+        a = node(low, depth + 1)
+        if high == low ^ ((1 << half) - 1):
+            expression = "{0} ^ {1}".format(a, variable)
+        else:
+            b = node(high, depth + 1)
+            if a == "0":
+                expression = "{0} & {1}".format(b, variable)
+            elif b == "0":
+                expression = "{0} & ({1} ^ mask)".format(a, variable)
+            elif a == "mask":
+                expression = "{0} | ({1} ^ mask)".format(b, variable)
+            elif b == "mask":
+                expression = "{0} | {1}".format(a, variable)
+            else:
+                expression = "{0} ^ (({0} ^ {1}) & {2})".format(a, b, variable)
+
+        result = "t" + str(len(lines))
+        lines.append("    {0} = {1}".format(result, expression))
+        nodes[(truth, depth)] = result
+
+        return result
+
+    outputs = []
+    for output_bit in range(4):
+        truth = 0
+        for six_bits in range(64):
+            m = ((six_bits >> 4) & 2) | (six_bits & 1)
+            n = (six_bits >> 1) & 15
+            if s_box[(m << 4) + n] & (8 >> output_bit):
+                truth |= 1 << six_bits
+
+        outputs.append(node(truth, 0))
+
+    return (
+        "def {0}(x0, x1, x2, x3, x4, x5, mask):\n".format(name)
+        + "\n".join(lines)
+        + "\n    return {0}\n".format(", ".join(outputs))
+    )
+
+
+def _compile_s_boxes():
+    namespace = {}
+    s_box_functions = []
+    for j, s_box in enumerate(constants.s_boxes):
+        name = "s_box_" + str(j + 1)
+        exec(build_s_box_source(s_box, name), namespace)
+        s_box_functions.append(namespace[name])
+
+    return s_box_functions
+
+
+def _build_sub_key_indexes():
+    c_block = [constants.permuted_choice_1[i] for i in range(28)]
+    d_block = [constants.permuted_choice_1[i + 28] for i in range(28)]
+
+    sub_key_indexes = []
+    for rotation in constants.bits_rotation_table:
+        c_block = c_block[rotation:] + c_block[:rotation]
+        d_block = d_block[rotation:] + d_block[:rotation]
+
+        c_d_vector = c_block + d_block
+        sub_key_indexes.append(
+            [c_d_vector[index] for index in constants.permuted_choice_2]
+        )
+
+    return sub_key_indexes
+
+
+s_boxes = _compile_s_boxes()
+
+# for every iteration, key bits that make its sub key
+sub_key_indexes = _build_sub_key_indexes()
+
+
+def bytes_to_lanes(data):
+    """
+        Transposes blocks into lanes. Lane i holds bit i of every block,
+        the first block is the most significant bit of the lane.
+
+    :param data: bytes, length must be a multiple of 8
+    :return: list of 64 integers
+    """
+    lanes = []
+    for byte_index in range(BLOCK_SIZE):
+        column = bytes(data[byte_index::BLOCK_SIZE])
+        for bit in range(8):
+            lanes.append(int(column.translate(_BIT_TABLES[bit]) or b"0", 2))
+
+    return lanes
+
+
+def lanes_to_bytes(lanes, count):
+    """
+        Transposes lanes back into blocks
+
+    :param lanes: list of 64 integers
+    :param count: number of blocks
+    :return: bytes
+    """
+    data = bytearray(BLOCK_SIZE * count)
+    if count == 0:
+        return bytes(data)
+
+    lane_format = "0" + str(count) + "b"
+    for byte_index in range(BLOCK_SIZE):
+        column = 0
+        for bit in range(8):
+            digits = (
+                format(lanes[8 * byte_index + bit], lane_format)
+                .encode("ascii")
+                .translate(_DIGIT_TABLE)
+            )
+            column |= int.from_bytes(digits, "big") << (7 - bit)
+
+        data[byte_index::BLOCK_SIZE] = column.to_bytes(count, "big")
+
+    return bytes(data)
+
+
+def _key_bytes(key):
+    if isinstance(key, key_schedule.DESKey):
+        key = key.key
+    elif isinstance(key, str):
+        key = key.encode("ascii")
+
+    if len(key) < 8:
+        raise ValueError("Invalid key length, key must be 8 bytes\n")
+
+    return bytes(key[:8])
+
+
+def key_to_lanes(key, mask):
+    """
+        Spreads one key over all lanes
+
+    :param key: key as string, bytes or DESKey
+    :param mask: lanes mask, all lanes bits set
+    :return: list of 64 integers
+    """
+    key_bits = int.from_bytes(_key_bytes(key), "big")
+
+    return [mask if (key_bits >> (63 - i)) & 1 else 0 for i in range(64)]
+
+
+def crypt_lanes(lanes, key_lanes, crypt_type, mask):
+    """
+        Crypts bitsliced blocks. Permutations only reorder lanes, S-boxes
+        are gates networks over lanes, so every operation crypts one bit of
+        all blocks at once. Each lane may use its own key.
+
+    :param lanes: list of 64 integers
+    :param key_lanes: list of 64 integers with key bits of every lane
+    :param crypt_type: ENCRYPT or DECRYPT
+    :param mask: lanes mask, all lanes bits set
+    :return: list of 64 integers
+    """
+    sub_keys = [
+        [key_lanes[index] for index in indexes] for indexes in sub_key_indexes
+    ]
+    if crypt_type == key_schedule.DECRYPT:
+        sub_keys.reverse()
+
+    block = [lanes[index] for index in constants.initial_permutation]
+    left_block = block[:32]
+    right_block = block[32:]
+
+    expansion_function = constants.expansion_function
+    permutation = constants.permutation
+
+    for iteration_key in sub_keys:
+        expanded = [
+            right_block[index] ^ key_bit
+            for index, key_bit in zip(expansion_function, iteration_key)
+        ]
+
+        substituted = []
+        for j, s_box in enumerate(s_boxes):
+            substituted.extend(s_box(*expanded[6 * j : 6 * j + 6], mask))
+
+        left_block, right_block = right_block, [
+            bit ^ substituted[index]
+            for bit, index in zip(left_block, permutation)
+        ]
+
+    block = right_block + left_block
+
+    return [block[index] for index in constants.final_permutation]
+
+
+def crypt(data, crypt_type, key):
+    """
+        Crypts bytes in ECB mode with bitsliced engine
+
+    :param data: bytes, length must be a multiple of 8
+    :param crypt_type: ENCRYPT or DECRYPT
+    :param key: key to crypt with
+    :return: crypted bytes
+    """
+    count = len(data) // BLOCK_SIZE
+    mask = (1 << count) - 1
+
+    lanes = crypt_lanes(
+        bytes_to_lanes(data), key_to_lanes(key, mask), crypt_type, mask
+    )
+
+    return lanes_to_bytes(lanes, count)
+
+
+def encrypt_with_keys(block, keys):
+    """
+        Encrypts one block with many keys at once, every key gets own lane
+
+    :param block: 8 bytes to encrypt
+    :param keys: list of 8-byte keys
+    :return: list of encrypted blocks, one per key
+    """
+    count = len(keys)
+    mask = (1 << count) - 1
+
+    lanes = [mask if lane else 0 for lane in bytes_to_lanes(block)]
+    key_lanes = bytes_to_lanes(b"".join(_key_bytes(key) for key in keys))
+
+    data = lanes_to_bytes(
+        crypt_lanes(lanes, key_lanes, key_schedule.ENCRYPT, mask), count
+    )
+
+    return [data[i : i + BLOCK_SIZE] for i in range(0, len(data), BLOCK_SIZE)]
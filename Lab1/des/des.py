@@ -1,9 +1,24 @@
+import struct
+
+import Lab1.des.batch as batch
+import Lab1.des.bitslice as bitslice
 import Lab1.des.constants as constants
+import Lab1.des.key_schedule as key_schedule
+import Lab1.des.permutations as permutations
+import Lab1.des.tables as tables
 import Lab1.des.utils as utils
 
 
-ENCRYPT = 0
-DECRYPT = 1
+ENCRYPT = key_schedule.ENCRYPT
+DECRYPT = key_schedule.DECRYPT
+
+LIST_ENGINE = 0
+INTEGER_ENGINE = 1
+BATCH_ENGINE = 2
+BITSLICE_ENGINE = 3
+
+# data size from which batch engine pays off its per iteration array setup
+BATCH_THRESHOLD = 512
 
 
 def encrypt(data, key):
@@ -11,7 +26,7 @@ def encrypt(data, key):
         Encrypts passed data with passed key
 
     :param data: data to encrypt
-    :param key: key to encrypt with
+    :param key: key to encrypt with, string or DESKey
     :return: encrypted data as bytes
     """
     return crypt(data, ENCRYPT, key)
@@ -22,21 +37,84 @@ def decrypt(encrypted_data, key):
         Decrypts passed data with passed key
 
     :param encrypted_data: data to decrypt
-    :param key: key to decrypt with
+    :param key: key to decrypt with, string or DESKey
     :return: decrypted data as bytes
     """
     return crypt(encrypted_data, DECRYPT, key)
 
 
-def crypt(data, crypt_type, key, block_size=8, padding_byte=" "):
+def encrypt_into(data, out, key, padding_byte=" "):
+    """
+        Encrypts passed buffer into another one without intermediate copies
+
+    :param data: bytes-like object to encrypt
+    :param out: writable bytes-like object, at least data length rounded up
+        to block size. May be data itself to encrypt in place
+    :param key: key to encrypt with, string or DESKey
+    :param padding_byte: byte to pad the last block with
+    :return: number of written bytes
+    """
+    return crypt_into(data, out, ENCRYPT, key, padding_byte)
+
+
+def decrypt_into(encrypted_data, out, key):
+    """
+        Decrypts passed buffer into another one without intermediate copies
+
+    :param encrypted_data: bytes-like object to decrypt
+    :param out: writable bytes-like object of at least data length. May be
+        encrypted_data itself to decrypt in place
+    :param key: key to decrypt with, string or DESKey
+    :return: number of written bytes
+    """
+    return crypt_into(encrypted_data, out, DECRYPT, key)
+
+
+def encrypt_blocks(blocks, key):
+    """
+        Encrypts numpy array of 64-bit blocks all at once
+
+    :param blocks: numpy uint64 array of blocks
+    :param key: key to encrypt with, string or DESKey
+    :return: numpy uint64 array of encrypted blocks
+    """
+    return batch.encrypt_blocks(blocks, key)
+
+
+def decrypt_blocks(blocks, key):
+    """
+        Decrypts numpy array of 64-bit blocks all at once
+
+    :param blocks: numpy uint64 array of blocks
+    :param key: key to decrypt with, string or DESKey
+    :return: numpy uint64 array of decrypted blocks
+    """
+    return batch.decrypt_blocks(blocks, key)
+
+
+def crypt(
+    data,
+    crypt_type,
+    key,
+    block_size=8,
+    padding_byte=" ",
+    engine=None,
+):
     """
         Main DES flow. Separates data in blocks and passes them to DES algorithm.
 
     :param padding_byte: optional argument for encryption padding. Must only be one byte
-    :param key: key to crypt data
+    :param key: key to crypt data, string or DESKey. Key schedules of recently
+        used keys are cached
     :param data: bits array to encrypt
     :param crypt_type: ENCRYPT or DECRYPT
     :param block_size: the size of data blocks
+    :param engine: LIST_ENGINE (bits arrays), INTEGER_ENGINE (32-bit halves),
+        BATCH_ENGINE (numpy arrays of blocks) or BITSLICE_ENGINE (blocks
+        transposed into lanes of big integers). By default batch engine is
+        used for data of BATCH_THRESHOLD bytes and more when numpy is
+        installed, integer engine otherwise. Batch engine falls back to
+        integer engine without numpy
     :return: crypted data
     """
     data = utils.add_padding_to_data(data, block_size, padding_byte)
@@ -48,6 +126,35 @@ def crypt(data, crypt_type, key, block_size=8, padding_byte=" "):
             + " bytes\n"
         )
 
+    if engine is None:
+        if batch.is_available() and len(data) >= BATCH_THRESHOLD:
+            engine = BATCH_ENGINE
+        else:
+            engine = INTEGER_ENGINE
+
+    if (
+        engine == BATCH_ENGINE
+        and block_size == batch.BLOCK_SIZE
+        and batch.is_available()
+    ):
+        return batch.crypt(data, crypt_type, key)
+
+    if engine == BITSLICE_ENGINE and block_size == bitslice.BLOCK_SIZE:
+        return bitslice.crypt(data, crypt_type, key)
+
+    if engine == INTEGER_ENGINE or engine == BATCH_ENGINE:
+        sub_keys = key_schedule.get_key(key).sub_keys(crypt_type)
+
+        return b"".join(
+            des_algorithm_int(
+                int.from_bytes(data[i : i + block_size], "big"), sub_keys
+            ).to_bytes(block_size, "big")
+            for i in range(0, len(data), block_size)
+        )
+
+    if isinstance(key, key_schedule.DESKey):
+        key = key.key
+
     sub_keys = utils.generate_sub_keys(key)
     if crypt_type == DECRYPT:
         sub_keys.reverse()
@@ -66,6 +173,110 @@ def crypt(data, crypt_type, key, block_size=8, padding_byte=" "):
     return bytes.fromhex("").join(crypted_data)
 
 
+def crypt_into(data, out, crypt_type, key, padding_byte=" "):
+    """
+        Crypts data block by block straight into out buffer. Only the last
+        partial block is copied to be padded.
+
+    :param data: bytes-like object to crypt
+    :param out: writable bytes-like object, may be data itself
+    :param crypt_type: ENCRYPT or DECRYPT
+    :param key: key to crypt data, string or DESKey
+    :param padding_byte: byte to pad the last block with
+    :return: number of written bytes
+    """
+    block_size = 8
+    data = memoryview(data).cast("B")
+    out = memoryview(out).cast("B")
+
+    length = len(data)
+    full_length = length - length % block_size
+    padded_length = full_length
+    if full_length != length:
+        if crypt_type == DECRYPT or padding_byte is None:
+            raise ValueError(
+                "Invalid data length, data must be a multiple of "
+                + str(block_size)
+                + " bytes\n"
+            )
+
+        padded_length += block_size
+
+    if len(out) < padded_length:
+        raise ValueError(
+            "Output buffer is too small, "
+            + str(padded_length)
+            + " bytes required\n"
+        )
+
+    if batch.is_available() and full_length >= BATCH_THRESHOLD:
+        batch.crypt_into(
+            data[:full_length], out[:full_length], crypt_type, key
+        )
+    else:
+        sub_keys = key_schedule.get_key(key).sub_keys(crypt_type)
+        block_struct = struct.Struct(">Q")
+        for i in range(0, full_length, block_size):
+            block_struct.pack_into(
+                out,
+                i,
+                des_algorithm_int(
+                    block_struct.unpack_from(data, i)[0], sub_keys
+                ),
+            )
+
+    if full_length != length:
+        last_block = utils.add_padding_to_data(
+            bytes(data[full_length:]), block_size, padding_byte
+        )
+        sub_keys = key_schedule.get_key(key).sub_keys(crypt_type)
+        out[full_length:padded_length] = des_algorithm_int(
+            int.from_bytes(last_block, "big"), sub_keys
+        ).to_bytes(block_size, "big")
+
+    return padded_length
+
+
+def crypt_multiple(data, passes, block_size=8, padding_byte=" "):
+    """
+        Crypts data with several DES passes in one go. Data is padded once
+        and every block goes through all passes before the next one.
+
+    :param data: data to crypt
+    :param passes: list of (crypt_type, key) pairs, applied in order
+    :param block_size: the size of data blocks
+    :param padding_byte: optional argument for encryption padding
+    :return: crypted data
+    """
+    data = utils.add_padding_to_data(data, block_size, padding_byte)
+
+    if len(data) % block_size != 0:
+        raise ValueError(
+            "Invalid data length, data must be a multiple of "
+            + str(block_size)
+            + " bytes\n"
+        )
+
+    sub_keys_list = [
+        key_schedule.get_key(key).sub_keys(crypt_type)
+        for crypt_type, key in passes
+    ]
+
+    if batch.is_available() and len(data) >= BATCH_THRESHOLD:
+        return batch.blocks_to_bytes(
+            batch.crypt_blocks_multiple(
+                batch.bytes_to_blocks(data), sub_keys_list
+            )
+        )
+
+    return b"".join(
+        multiple_des_algorithm_int(
+            int.from_bytes(data[i : i + block_size], "big"), sub_keys_list
+        ).to_bytes(block_size, "big")
+        for i in range(0, len(data), block_size)
+    )
+
+
 def des_algorithm(block, sub_keys):
     """
         Crypts block with DES algorithm
@@ -150,6 +361,82 @@ def des_algorithm_iteration(left_block, right_block, iteration_key):
     return left_block, right_block
 
 
+def des_algorithm_int(block, sub_keys):
+    """
+        Crypts block with DES algorithm using integer halves
+
+    :param sub_keys: keys for des iterations as 48-bit integers
+    :param block: block passed for crypting as 64-bit integer
+    :return: crypted block as 64-bit integer
+    """
+    block = permutations.initial_permutation(block)
+
+    left_block, right_block = des_iterations_int(
+        block >> 32, block & 0xFFFFFFFF, sub_keys
+    )
+
+    return permutations.final_permutation((right_block << 32) | left_block)
+
+
+def multiple_des_algorithm_int(block, sub_keys_list):
+    """
+        Crypts block with several DES passes in a row. Final permutation of
+        a pass and initial permutation of the next one cancel out, so only
+        halves are swapped between passes.
+
+    :param sub_keys_list: keys for des iterations of every pass
+    :param block: block passed for crypting as 64-bit integer
+    :return: crypted block as 64-bit integer
+    """
+    block = permutations.initial_permutation(block)
+
+    left_block = block >> 32
+    right_block = block & 0xFFFFFFFF
+
+    for sub_keys in sub_keys_list:
+        right_block, left_block = des_iterations_int(
+            left_block, right_block, sub_keys
+        )
+
+    return permutations.final_permutation((left_block << 32) | right_block)
+
+
+def des_iterations_int(left_block, right_block, sub_keys):
+    """
+        DES algorithm iterations on integer halves. Each iteration looks the
+        expanded and keyed six bits groups up in the combined S-box and
+        permutation tables.
+
+    :param left_block: left block as 32-bit integer
+    :param right_block: right block as 32-bit integer
+    :param sub_keys: keys for des iterations as 48-bit integers
+    :return: new left and right blocks
+    """
+    sp_1, sp_2, sp_3, sp_4, sp_5, sp_6, sp_7, sp_8 = tables.sp_boxes
+
+    for iteration_key in sub_keys:
+        # right block rotated into 34 bits, so expansion groups are plain
+        # six bits windows moving by four bits
+        r = (
+            ((right_block & 1) << 33)
+            | (right_block << 1)
+            | (right_block >> 31)
+        )
+        left_block, right_block = right_block, (
+            left_block
+            ^ sp_1[((r >> 28) ^ (iteration_key >> 42)) & 0x3F]
+            ^ sp_2[((r >> 24) ^ (iteration_key >> 36)) & 0x3F]
+            ^ sp_3[((r >> 20) ^ (iteration_key >> 30)) & 0x3F]
+            ^ sp_4[((r >> 16) ^ (iteration_key >> 24)) & 0x3F]
+            ^ sp_5[((r >> 12) ^ (iteration_key >> 18)) & 0x3F]
+            ^ sp_6[((r >> 8) ^ (iteration_key >> 12)) & 0x3F]
+            ^ sp_7[((r >> 4) ^ (iteration_key >> 6)) & 0x3F]
+            ^ sp_8[(r ^ iteration_key) & 0x3F]
+        )
+
+    return left_block, right_block
+
+
 if __name__ == "__main__":
     key = "ASDFGHJK"
 
@@ -11,10 +11,9 @@ def encrypt(data, first_key, second_key):
     :return: encrypted data as bytes
     """
 
-    first_encryption = des.encrypt(data, first_key)
-    second_encryption = des.encrypt(first_encryption, second_key)
-
-    return second_encryption
+    return des.crypt_multiple(
+        data, [(des.ENCRYPT, first_key), (des.ENCRYPT, second_key)]
+    )
 
 
 def decrypt(encrypted_data, first_key, second_key):
@@ -27,7 +26,6 @@ def decrypt(encrypted_data, first_key, second_key):
     :return: decrypted data as bytes
     """
 
-    first_decryption = des.decrypt(encrypted_data, second_key)
-    second_decryption = des.decrypt(first_decryption, first_key)
-
-    return second_decryption
+    return des.crypt_multiple(
+        encrypted_data, [(des.DECRYPT, second_key), (des.DECRYPT, first_key)]
+    )
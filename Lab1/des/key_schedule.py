@@ -0,0 +1,56 @@
+import functools
+
+import Lab1.des.utils as utils
+
+
+ENCRYPT = 0
+DECRYPT = 1
+
+CACHE_SIZE = 128
+
+
+class DESKey(object):
+    """
+        DES key with precomputed encryption and decryption sub keys
+    """
+
+    def __init__(self, key):
+        if isinstance(key, str):
+            key = key.encode("ascii")
+
+        self.key = bytes(key)
+        self.encryption_sub_keys = tuple(utils.generate_int_sub_keys(self.key))
+        self.decryption_sub_keys = self.encryption_sub_keys[::-1]
+
+    def sub_keys(self, crypt_type):
+        """
+            Returns sub keys for passed direction
+
+        :param crypt_type: ENCRYPT or DECRYPT
+        :return: tuple of 48-bit integers
+        """
+        if crypt_type == DECRYPT:
+            return self.decryption_sub_keys
+
+        return self.encryption_sub_keys
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _get_cached_key(key):
+    return DESKey(key)
+
+
+def get_key(key):
+    """
+        Returns key context for passed key, reusing recently used ones
+
+    :param key: key as string, bytes or DESKey
+    :return: DESKey
+    """
+    if isinstance(key, DESKey):
+        return key
+
+    if isinstance(key, str):
+        key = key.encode("ascii")
+
+    return _get_cached_key(bytes(key))
@@ -0,0 +1,382 @@
+import concurrent.futures
+import itertools
+import json
+import os
+import time
+
+import Lab1.des.bitslice as bitslice
+import Lab1.des.des as des
+import Lab1.des.key_space as key_space
+import Lab1.des.permutations as permutations
+
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+PRINTABLE_ASCII = bytes(range(32, 127))
+
+# keys encrypted at once by bitsliced search, one lane each
+BITSLICE_BATCH = 1 << 14
+
+# chunks submitted ahead for every worker process
+MAX_PENDING_PER_WORKER = 2
+
+
+def _build_deltas(space):
+    """
+        For every key byte, sub keys changes made by moving it to the next
+        candidate, the last candidate moves back to the first one
+    """
+    contributions = key_space.get_contributions()
+
+    deltas = []
+    for position, values in enumerate(space.candidates):
+        position_deltas = []
+        for i, value in enumerate(values):
+            next_value = values[(i + 1) % len(values)]
+            position_deltas.append(
+                tuple(
+                    a ^ b
+                    for a, b in zip(
+                        contributions[position][value],
+                        contributions[position][next_value],
+                    )
+                )
+            )
+
+        deltas.append(position_deltas)
+
+    return deltas
+
+
+def iter_keys(space, start, stop):
+    """
+        Iterates keys by numbers like KeySpace.iter_keys, but keys sharing a
+        prefix are made by itertools.product instead of one by one
+
+    :param space: KeySpace
+    :param start: number of the first key
+    :param stop: number after the last key
+    :return: generator of 8-byte keys
+    """
+    candidates = space.candidates
+    sizes = [len(values) for values in candidates]
+
+    index = start
+    while index < stop:
+        # the longest suffix whose whole run starts at index and fits
+        position = key_space.KEY_SIZE
+        run = 1
+        while (
+            position > 0
+            and index % (run * sizes[position - 1]) == 0
+            and index + run * sizes[position - 1] <= stop
+        ):
+            position -= 1
+            run *= sizes[position]
+
+        prefix = space.key_at(index)[:position]
+        for suffix in itertools.product(*candidates[position:]):
+            yield prefix + bytes(suffix)
+
+        index += run
+
+
+def _search_chunk_bitslice(space, plaintext, ciphertext, start, stop, checks):
+    plaintext = plaintext.to_bytes(bitslice.BLOCK_SIZE, "big")
+    ciphertext = ciphertext.to_bytes(bitslice.BLOCK_SIZE, "big")
+
+    found = []
+    keys = iter_keys(space, start, stop)
+    while True:
+        batch = list(itertools.islice(keys, BITSLICE_BATCH))
+        if not batch:
+            return found
+
+        blocks = bitslice.encrypt_with_keys(plaintext, batch)
+        for key, block in zip(batch, blocks):
+            if block != ciphertext:
+                continue
+
+            sub_keys = key_space.generate_sub_keys(key)
+            if all(
+                des.des_algorithm_int(check_plaintext, sub_keys)
+                == check_ciphertext
+                for check_plaintext, check_ciphertext in checks
+            ):
+                found.append(key)
+
+
+def search_chunk(
+    space,
+    plaintext,
+    ciphertext,
+    start,
+    stop,
+    checks=(),
+    engine=des.BITSLICE_ENGINE,
+):
+    """
+        Tests keys from start to stop number. Bitslice engine encrypts
+        plaintext with thousands of keys at once, one key per lane. Integer
+        engine updates sub keys only by changed key bytes and checks the
+        block after 15 iterations, whose right half must match the left half
+        of the last iteration.
+
+    :param space: KeySpace to search
+    :param plaintext: known block as 64-bit integer
+    :param ciphertext: its encryption as 64-bit integer
+    :param start: number of the first key
+    :param stop: number after the last key
+    :param checks: other (plaintext, ciphertext) pairs as integers
+    :param engine: BITSLICE_ENGINE or INTEGER_ENGINE of des
+    :return: list of found keys
+    """
+    if start >= stop:
+        return []
+
+    if engine == des.BITSLICE_ENGINE:
+        return _search_chunk_bitslice(
+            space, plaintext, ciphertext, start, stop, checks
+        )
+
+    deltas = _build_deltas(space)
+    sizes = [len(values) for values in space.candidates]
+
+    digits = []
+    index = start
+    for size in reversed(sizes):
+        index, digit = divmod(index, size)
+        digits.append(digit)
+    digits.reverse()
+
+    sub_keys = list(key_space.generate_sub_keys(space.key_at(start)))
+
+    block = permutations.initial_permutation(plaintext)
+    left_block = block >> 32
+    right_block = block & 0xFFFFFFFF
+
+    expected = permutations.initial_permutation(ciphertext)
+    expected_right = expected >> 32
+    expected_left = expected & 0xFFFFFFFF
+
+    found = []
+    for _ in range(start, stop):
+        left, right = des.des_iterations_int(
+            left_block, right_block, sub_keys[:15]
+        )
+
+        if right == expected_left:
+            left, right = des.des_iterations_int(left, right, sub_keys[15:])
+            if left == expected_left and right == expected_right:
+                key = space.key_at(_digits_to_index(digits, sizes))
+                if all(
+                    des.des_algorithm_int(check_plaintext, sub_keys)
+                    == check_ciphertext
+                    for check_plaintext, check_ciphertext in checks
+                ):
+                    found.append(key)
+
+        position = len(digits) - 1
+        while position >= 0:
+            delta = deltas[position][digits[position]]
+            sub_keys = [a ^ b for a, b in zip(sub_keys, delta)]
+
+            digits[position] += 1
+            if digits[position] < sizes[position]:
+                break
+
+            digits[position] = 0
+            position -= 1
+
+    return found
+
+
+def _digits_to_index(digits, sizes):
+    index = 0
+    for digit, size in zip(digits, sizes):
+        index = index * size + digit
+
+    return index
+
+
+def _search_identity(space, plaintext, ciphertext, chunk_size):
+    # everything a checkpoint must match to be resumed
+    return {
+        "space_size": len(space),
+        "chunk_size": chunk_size,
+        "plaintext": format(plaintext, "016x"),
+        "ciphertext": format(ciphertext, "016x"),
+        "candidates": [values.hex() for values in space.candidates],
+    }
+
+
+def _load_checkpoint(path, identity):
+    if path is None or not os.path.exists(path):
+        return 0, set(), []
+
+    with open(path, "r") as file:
+        state = json.load(file)
+
+    if any(state.get(name) != value for name, value in identity.items()):
+        raise ValueError("Checkpoint was made for another search\n")
+
+    return (
+        state["done_below"],
+        set(state["completed"]),
+        [bytes.fromhex(key) for key in state["found"]],
+    )
+
+
+def _save_checkpoint(path, identity, done_below, completed, found):
+    state = dict(identity)
+    state.update(
+        {
+            "done_below": done_below,
+            "completed": sorted(completed),
+            "found": [key.hex() for key in found],
+        }
+    )
+
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w") as file:
+        json.dump(state, file)
+
+    os.replace(temporary_path, path)
+
+
+def search(
+    plaintext,
+    ciphertext,
+    space,
+    checks=(),
+    workers=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    checkpoint_path=None,
+    progress=None,
+    engine=des.BITSLICE_ENGINE,
+):
+    """
+        Searches DES key by known plaintext over constrained key space.
+        Chunks of key space are tested by worker processes, completed chunks
+        are saved to checkpoint so interrupted search can be resumed.
+        Checkpoint keeps the number below which all keys are tested and the
+        few chunks completed out of order above it, and only a few chunks
+        per worker are in flight, so huge spaces take constant memory.
+
+    :param plaintext: known 8-byte block
+    :param ciphertext: its 8-byte DES encryption
+    :param space: KeySpace to search, see key_space.from_mask
+    :param checks: other (plaintext, ciphertext) block pairs to filter out
+        false matches
+    :param workers: number of processes, 1 to run in this process
+    :param chunk_size: number of keys in one worker task
+    :param checkpoint_path: file to save progress to and resume from
+    :param progress: function called with statistics dict after every chunk
+    :param engine: BITSLICE_ENGINE or INTEGER_ENGINE of des
+    :return: dict with found "keys", "tested" keys number, "elapsed"
+        seconds and "keys_per_second"
+    """
+    plaintext = int.from_bytes(plaintext, "big")
+    ciphertext = int.from_bytes(ciphertext, "big")
+    checks = [
+        (
+            int.from_bytes(check_plaintext, "big"),
+            int.from_bytes(expected, "big"),
+        )
+        for check_plaintext, expected in checks
+    ]
+
+    identity = _search_identity(space, plaintext, ciphertext, chunk_size)
+    done_below, completed, found = _load_checkpoint(checkpoint_path, identity)
+    size = len(space)
+
+    def iter_chunks():
+        for start in range(done_below, size, chunk_size):
+            if start not in completed:
+                yield start, min(start + chunk_size, size)
+
+    def tested_keys():
+        return done_below + sum(
+            min(chunk_size, size - start) for start in completed
+        )
+
+    statistics = {
+        "keys": found,
+        "tested": 0,
+        "elapsed": 0.0,
+        "keys_per_second": 0.0,
+        "progress": tested_keys() / max(size, 1),
+    }
+    started = time.time()
+
+    def chunk_done(start, stop, keys):
+        nonlocal done_below
+
+        completed.add(start)
+        while done_below in completed:
+            completed.remove(done_below)
+            done_below = min(done_below + chunk_size, size)
+
+        found.extend(keys)
+
+        statistics["tested"] += stop - start
+        statistics["elapsed"] = time.time() - started
+        statistics["keys_per_second"] = statistics["tested"] / max(
+            statistics["elapsed"], 1e-9
+        )
+        statistics["progress"] = tested_keys() / size
+
+        if checkpoint_path is not None:
+            _save_checkpoint(
+                checkpoint_path, identity, done_below, completed, found
+            )
+
+        if progress is not None:
+            progress(statistics)
+
+    if workers == 1:
+        for start, stop in iter_chunks():
+            chunk_done(
+                start,
+                stop,
+                search_chunk(
+                    space, plaintext, ciphertext, start, stop, checks, engine
+                ),
+            )
+    else:
+        workers = workers or os.cpu_count() or 1
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            chunks = iter_chunks()
+            futures = {}
+            while True:
+                for start, stop in itertools.islice(
+                    chunks, MAX_PENDING_PER_WORKER * workers - len(futures)
+                ):
+                    future = executor.submit(
+                        search_chunk,
+                        space,
+                        plaintext,
+                        ciphertext,
+                        start,
+                        stop,
+                        checks,
+                        engine,
+                    )
+                    futures[future] = (start, stop)
+
+                if not futures:
+                    break
+
+                done, _ = concurrent.futures.wait(
+                    futures, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    start, stop = futures.pop(future)
+                    chunk_done(start, stop, future.result())
+
+    statistics["elapsed"] = time.time() - started
+    statistics["keys_per_second"] = statistics["tested"] / max(
+        statistics["elapsed"], 1e-9
+    )
+
+    return statistics
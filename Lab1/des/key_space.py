@@ -0,0 +1,127 @@
+import Lab1.des.utils as utils
+
+
+KEY_SIZE = 8
+
+_contributions = None
+
+
+def get_contributions():
+    """
+        Returns sub keys contribution of every key byte. Key schedule only
+        selects key bits, so sub keys of a key are XOR of contributions of
+        its bytes.
+
+    :return: contributions[position][byte] is tuple of 16 48-bit integers
+    """
+    global _contributions
+
+    if _contributions is None:
+        _contributions = []
+        for position in range(KEY_SIZE):
+            position_contributions = []
+            for value in range(256):
+                key = bytearray(KEY_SIZE)
+                key[position] = value
+                position_contributions.append(
+                    tuple(utils.generate_int_sub_keys(bytes(key)))
+                )
+
+            _contributions.append(position_contributions)
+
+    return _contributions
+
+
+def generate_sub_keys(key):
+    """
+        Generates encryption sub keys from byte contributions
+
+    :param key: 8 bytes
+    :return: tuple of 16 48-bit integers
+    """
+    contributions = get_contributions()
+
+    sub_keys = [0] * 16
+    for position, value in enumerate(key[:KEY_SIZE]):
+        for i, sub_key in enumerate(contributions[position][value]):
+            sub_keys[i] ^= sub_key
+
+    return tuple(sub_keys)
+
+
+class KeySpace(object):
+    """
+        Set of keys where every key byte is chosen from its own candidates.
+        Keys are numbered, the last byte changes first.
+    """
+
+    def __init__(self, candidates):
+        if len(candidates) != KEY_SIZE:
+            raise ValueError(
+                "Candidates must be passed for each of "
+                + str(KEY_SIZE)
+                + " key bytes\n"
+            )
+
+        self.candidates = [
+            value.encode("ascii") if isinstance(value, str) else bytes(value)
+            for value in candidates
+        ]
+
+        self.size = 1
+        for values in self.candidates:
+            if not values:
+                raise ValueError("Every key byte needs a candidate\n")
+
+            self.size *= len(values)
+
+    def __len__(self):
+        return self.size
+
+    def key_at(self, index):
+        """
+            Returns key by its number
+
+        :param index: number of key, from 0 to size - 1
+        :return: 8 bytes
+        """
+        key = bytearray(KEY_SIZE)
+        for position in range(KEY_SIZE - 1, -1, -1):
+            values = self.candidates[position]
+            index, digit = divmod(index, len(values))
+            key[position] = values[digit]
+
+        return bytes(key)
+
+    def iter_keys(self, start=0, stop=None):
+        """
+            Iterates keys by numbers
+
+        :param start: number of the first key
+        :param stop: number after the last key, size by default
+        :return: generator of 8-byte keys
+        """
+        if stop is None:
+            stop = self.size
+
+        for index in range(start, stop):
+            yield self.key_at(index)
+
+
+def from_mask(known_key, unknown_positions, alphabet):
+    """
+        Builds key space from partially known key
+
+    :param known_key: 8 bytes or string, values at unknown positions ignored
+    :param unknown_positions: positions of unknown key bytes
+    :param alphabet: candidates for unknown bytes, e.g. ASCII letters
+    :return: KeySpace
+    """
+    if isinstance(known_key, str):
+        known_key = known_key.encode("ascii")
+
+    candidates = [bytes([value]) for value in known_key[:KEY_SIZE]]
+    for position in unknown_positions:
+        candidates[position] = alphabet
+
+    return KeySpace(candidates)
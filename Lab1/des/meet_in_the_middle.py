@@ -0,0 +1,288 @@
+import array
+import concurrent.futures
+import functools
+import os
+import sqlite3
+import tempfile
+
+import Lab1.des.des as des
+import Lab1.des.key_space as key_space
+
+
+DEFAULT_CHUNK_SIZE = 1 << 14
+
+# number of forward values kept in memory before spilling to disk
+DEFAULT_MEMORY_ENTRIES = 1 << 22
+
+_SIGN_BIT = 1 << 63
+
+_backward_state = None
+
+
+def _to_signed(value):
+    # sqlite integers are signed 64-bit
+    return value - (1 << 64) if value & _SIGN_BIT else value
+
+
+class ForwardIndex(object):
+    """
+        Maps middle values to numbers of first keys. Values are kept in
+        memory until memory_entries is reached, then everything is moved to
+        a sqlite table on disk.
+    """
+
+    def __init__(self, memory_entries=DEFAULT_MEMORY_ENTRIES, directory=None):
+        self.memory_entries = memory_entries
+        self.directory = directory
+        self.entries = {}
+        self.size = 0
+        self.path = None
+        self._connection = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        return state
+
+    def _connect(self):
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path)
+
+        return self._connection
+
+    def _spill(self):
+        handle, self.path = tempfile.mkstemp(
+            suffix=".sqlite", dir=self.directory
+        )
+        os.close(handle)
+
+        connection = self._connect()
+        connection.execute(
+            "CREATE TABLE forward (middle INTEGER, key_index INTEGER)"
+        )
+        self._insert(
+            (middle, index)
+            for middle, indexes in self.entries.items()
+            for index in (indexes if isinstance(indexes, list) else [indexes])
+        )
+        self.entries = {}
+
+    def _insert(self, pairs):
+        self._connect().executemany(
+            "INSERT INTO forward VALUES (?, ?)",
+            ((_to_signed(middle), index) for middle, index in pairs),
+        )
+
+    def add(self, middles, start):
+        """
+            Adds middle values of consecutive first keys
+
+        :param middles: middle values
+        :param start: number of the first key
+        """
+        if self.path is not None:
+            self._insert(zip(middles, range(start, start + len(middles))))
+            self.size += len(middles)
+            return
+
+        entries = self.entries
+        for index, middle in enumerate(middles, start):
+            previous = entries.get(middle)
+            if previous is None:
+                entries[middle] = index
+            elif isinstance(previous, list):
+                previous.append(index)
+            else:
+                entries[middle] = [previous, index]
+
+        self.size += len(middles)
+        if self.size > self.memory_entries:
+            self._spill()
+
+    def finish(self):
+        """
+            Prepares index for lookups
+        """
+        if self.path is not None:
+            connection = self._connect()
+            connection.execute(
+                "CREATE INDEX forward_middle ON forward (middle)"
+            )
+            connection.commit()
+            connection.close()
+            self._connection = None
+
+    def lookup(self, middle):
+        """
+            Finds first keys for middle value
+
+        :param middle: middle value
+        :return: list of first key numbers
+        """
+        if self.path is None:
+            indexes = self.entries.get(middle)
+            if indexes is None:
+                return []
+
+            return indexes if isinstance(indexes, list) else [indexes]
+
+        return [
+            row[0]
+            for row in self._connect().execute(
+                "SELECT key_index FROM forward WHERE middle = ?",
+                (_to_signed(middle),),
+            )
+        ]
+
+    def close(self):
+        """
+            Removes disk table if there is one
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+        if self.path is not None:
+            os.remove(self.path)
+            self.path = None
+
+
+def _forward_chunk(space, plaintext, start, stop):
+    middles = array.array("Q")
+    for index in range(start, stop):
+        middles.append(
+            des.des_algorithm_int(
+                plaintext, key_space.generate_sub_keys(space.key_at(index))
+            )
+        )
+
+    return start, middles
+
+
+def _init_backward(index, first_space, second_space, ciphertext, checks):
+    global _backward_state
+
+    _backward_state = (index, first_space, second_space, ciphertext, checks)
+
+
+def _backward_chunk(start, stop):
+    index, first_space, second_space, ciphertext, checks = _backward_state
+
+    found = []
+    for second_index in range(start, stop):
+        second_key = second_space.key_at(second_index)
+        second_sub_keys = key_space.generate_sub_keys(second_key)
+
+        middle = des.des_algorithm_int(ciphertext, second_sub_keys[::-1])
+        for first_index in index.lookup(middle):
+            first_key = first_space.key_at(first_index)
+            first_sub_keys = key_space.generate_sub_keys(first_key)
+
+            if all(
+                des.multiple_des_algorithm_int(
+                    plaintext, [first_sub_keys, second_sub_keys]
+                )
+                == expected
+                for plaintext, expected in checks
+            ):
+                found.append((first_key, second_key))
+
+    return found
+
+
+def _chunks(size, chunk_size):
+    return [
+        (start, min(start + chunk_size, size))
+        for start in range(0, size, chunk_size)
+    ]
+
+
+def _run(function, chunks, workers, initializer=None, initargs=()):
+    if workers == 1:
+        if initializer is not None:
+            initializer(*initargs)
+
+        for start, stop in chunks:
+            yield function(start, stop)
+
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(
+        workers, initializer=initializer, initargs=initargs
+    ) as executor:
+        for result in executor.map(
+            function,
+            [start for start, _ in chunks],
+            [stop for _, stop in chunks],
+        ):
+            yield result
+
+
+def search(
+    plaintext,
+    ciphertext,
+    first_space,
+    second_space=None,
+    checks=(),
+    workers=None,
+    memory_entries=DEFAULT_MEMORY_ENTRIES,
+    directory=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+):
+    """
+        Recovers double DES keys from known plaintext by meet in the middle.
+        Plaintext is encrypted with every first key and indexed, then
+        ciphertext is decrypted with every second key and looked up, so the
+        work is the sum of key spaces sizes instead of their product.
+
+    :param plaintext: known 8-byte block
+    :param ciphertext: its 8-byte double DES encryption
+    :param first_space: KeySpace of first keys
+    :param second_space: KeySpace of second keys, first_space by default
+    :param checks: other (plaintext, ciphertext) block pairs to filter out
+        false matches
+    :param workers: number of processes, 1 to run in this process
+    :param memory_entries: number of index entries kept in memory
+    :param directory: directory for disk index
+    :param chunk_size: number of keys in one worker task
+    :return: list of (first_key, second_key) pairs. DES ignores the lowest
+        bit of every key byte, so keys differing only in it are all returned
+    """
+    if second_space is None:
+        second_space = first_space
+
+    plaintext = int.from_bytes(plaintext, "big")
+    ciphertext = int.from_bytes(ciphertext, "big")
+    checks = [(plaintext, ciphertext)] + [
+        (
+            int.from_bytes(check_plaintext, "big"),
+            int.from_bytes(expected, "big"),
+        )
+        for check_plaintext, expected in checks
+    ]
+
+    index = ForwardIndex(memory_entries, directory)
+    try:
+        for start, middles in _run(
+            functools.partial(_forward_chunk, first_space, plaintext),
+            _chunks(len(first_space), chunk_size),
+            workers,
+        ):
+            index.add(middles, start)
+
+        index.finish()
+
+        found = []
+        for result in _run(
+            _backward_chunk,
+            _chunks(len(second_space), chunk_size),
+            workers,
+            _init_backward,
+            (index, first_space, second_space, ciphertext, checks),
+        ):
+            found.extend(result)
+
+        return found
+    finally:
+        _init_backward(None, None, None, None, None)
+        index.close()
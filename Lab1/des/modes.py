@@ -0,0 +1,256 @@
+import struct
+
+import Lab1.des.des as des
+import Lab1.des.key_schedule as key_schedule
+import Lab1.des.utils as utils
+
+
+ECB = 0
+CBC = 1
+CFB = 2
+OFB = 3
+CTR = 4
+
+BLOCK_SIZE = 8
+BLOCK_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+def _to_bytes(data):
+    if isinstance(data, str):
+        return data.encode("ascii")
+
+    return bytes(data)
+
+
+def _to_block_int(value):
+    if isinstance(value, int):
+        return value & BLOCK_MASK
+
+    value = _to_bytes(value)
+    if len(value) != BLOCK_SIZE:
+        raise ValueError(
+            "Invalid IV length, IV must be " + str(BLOCK_SIZE) + " bytes\n"
+        )
+
+    return int.from_bytes(value, "big")
+
+
+def _xor(data, stream):
+    length = len(data)
+
+    return (
+        int.from_bytes(data, "big") ^ int.from_bytes(stream[:length], "big")
+    ).to_bytes(length, "big")
+
+
+def _pack_blocks(blocks):
+    return struct.pack(">" + str(len(blocks)) + "Q", *blocks)
+
+
+def ctr_keystream(key, nonce, offset, length):
+    """
+        Generates CTR key stream for any byte range. Block i of the stream is
+        encrypted nonce + i, so range is computed without preceding blocks.
+
+    :param key: key to crypt with, string or DESKey
+    :param nonce: initial counter as integer or 8 bytes
+    :param offset: position of the first byte in the stream
+    :param length: number of bytes
+    :return: key stream bytes
+    """
+    nonce = _to_block_int(nonce)
+    first_block = offset // BLOCK_SIZE
+    last_block = (offset + length + BLOCK_SIZE - 1) // BLOCK_SIZE
+
+    counters = _pack_blocks(
+        [(nonce + i) & BLOCK_MASK for i in range(first_block, last_block)]
+    )
+    stream = des.crypt(counters, des.ENCRYPT, key, padding_byte=None)
+
+    skip = offset % BLOCK_SIZE
+    return stream[skip : skip + length]
+
+
+def ctr_crypt(data, key, nonce, offset=0):
+    """
+        Encrypts or decrypts data in CTR mode. No padding is needed, and data
+        may be a part of a longer message starting at offset.
+
+    :param data: data to crypt
+    :param key: key to crypt with, string or DESKey
+    :param nonce: initial counter as integer or 8 bytes
+    :param offset: position of data in the whole message
+    :return: crypted data as bytes
+    """
+    data = _to_bytes(data)
+
+    return _xor(data, ctr_keystream(key, nonce, offset, len(data)))
+
+
+def ctr_read(reader, key, nonce, start, length):
+    """
+        Decrypts byte range of CTR encrypted file without reading the
+        data before it
+
+    :param reader: binary file object opened for reading, seekable
+    :param key: key to decrypt with, string or DESKey
+    :param nonce: initial counter used for encryption
+    :param start: position of the first byte to decrypt
+    :param length: number of bytes to decrypt
+    :return: decrypted bytes
+    """
+    reader.seek(start)
+    data = reader.read(length)
+
+    return ctr_crypt(data, key, nonce, start)
+
+
+def cbc_encrypt(data, key, iv, padding_byte=" "):
+    """
+        Encrypts data in CBC mode
+
+    :param data: data to encrypt
+    :param key: key to encrypt with, string or DESKey
+    :param iv: initialization vector as integer or 8 bytes
+    :param padding_byte: byte to pad data with
+    :return: encrypted data as bytes
+    """
+    data = utils.add_padding_to_data(_to_bytes(data), BLOCK_SIZE, padding_byte)
+    sub_keys = key_schedule.get_key(key).sub_keys(des.ENCRYPT)
+
+    previous = _to_block_int(iv)
+    blocks = []
+    for (block,) in struct.iter_unpack(">Q", data):
+        previous = des.des_algorithm_int(block ^ previous, sub_keys)
+        blocks.append(previous)
+
+    return _pack_blocks(blocks)
+
+
+def cbc_decrypt(encrypted_data, key, iv):
+    """
+        Decrypts data in CBC mode. All blocks are decrypted at once and
+        then chained.
+
+    :param encrypted_data: data to decrypt
+    :param key: key to decrypt with, string or DESKey
+    :param iv: initialization vector used for encryption
+    :return: decrypted data as bytes
+    """
+    encrypted_data = _to_bytes(encrypted_data)
+    if len(encrypted_data) % BLOCK_SIZE != 0:
+        raise ValueError(
+            "Invalid data length, data must be a multiple of "
+            + str(BLOCK_SIZE)
+            + " bytes\n"
+        )
+
+    decrypted = des.crypt(encrypted_data, des.DECRYPT, key, padding_byte=None)
+    chain = _pack_blocks([_to_block_int(iv)]) + encrypted_data
+
+    return _xor(decrypted, chain)
+
+
+def cfb_encrypt(data, key, iv):
+    """
+        Encrypts data in CFB mode with 64-bit feedback
+
+    :param data: data to encrypt
+    :param key: key to encrypt with, string or DESKey
+    :param iv: initialization vector as integer or 8 bytes
+    :return: encrypted data as bytes
+    """
+    data = _to_bytes(data)
+    sub_keys = key_schedule.get_key(key).sub_keys(des.ENCRYPT)
+
+    previous = _to_block_int(iv)
+    stream = []
+    for i in range(0, len(data), BLOCK_SIZE):
+        stream.append(des.des_algorithm_int(previous, sub_keys))
+        previous = stream[-1] ^ int.from_bytes(
+            data[i : i + BLOCK_SIZE].ljust(BLOCK_SIZE, b"\0"), "big"
+        )
+
+    return _xor(data, _pack_blocks(stream))
+
+
+def cfb_decrypt(encrypted_data, key, iv):
+    """
+        Decrypts data in CFB mode with 64-bit feedback. Key stream only
+        depends on ciphertext, so all its blocks are computed at once.
+
+    :param encrypted_data: data to decrypt
+    :param key: key to decrypt with, string or DESKey
+    :param iv: initialization vector used for encryption
+    :return: decrypted data as bytes
+    """
+    encrypted_data = _to_bytes(encrypted_data)
+    count = (len(encrypted_data) + BLOCK_SIZE - 1) // BLOCK_SIZE
+
+    chain = (
+        _pack_blocks([_to_block_int(iv)])
+        + encrypted_data[: BLOCK_SIZE * (count - 1)]
+    )
+    stream = des.crypt(chain, des.ENCRYPT, key, padding_byte=None)
+
+    return _xor(encrypted_data, stream)
+
+
+def ofb_crypt(data, key, iv):
+    """
+        Encrypts or decrypts data in OFB mode
+
+    :param data: data to crypt
+    :param key: key to crypt with, string or DESKey
+    :param iv: initialization vector as integer or 8 bytes
+    :return: crypted data as bytes
+    """
+    data = _to_bytes(data)
+    sub_keys = key_schedule.get_key(key).sub_keys(des.ENCRYPT)
+
+    previous = _to_block_int(iv)
+    stream = []
+    for _ in range(0, len(data), BLOCK_SIZE):
+        previous = des.des_algorithm_int(previous, sub_keys)
+        stream.append(previous)
+
+    return _xor(data, _pack_blocks(stream))
+
+
+def crypt(data, crypt_type, key, mode=ECB, iv=None, padding_byte=" "):
+    """
+        Crypts data with passed mode of operation
+
+    :param data: data to crypt
+    :param crypt_type: ENCRYPT or DECRYPT
+    :param key: key to crypt with, string or DESKey
+    :param mode: ECB, CBC, CFB, OFB or CTR
+    :param iv: initialization vector or initial counter, not used for ECB
+    :param padding_byte: byte to pad data with in ECB and CBC encryption
+    :return: crypted data as bytes
+    """
+    if mode == ECB:
+        return des.crypt(data, crypt_type, key, padding_byte=padding_byte)
+
+    if iv is None:
+        raise ValueError("IV is required for this mode\n")
+
+    if mode == CTR:
+        return ctr_crypt(data, key, iv)
+
+    if mode == OFB:
+        return ofb_crypt(data, key, iv)
+
+    if mode == CBC:
+        if crypt_type == des.DECRYPT:
+            return cbc_decrypt(data, key, iv)
+
+        return cbc_encrypt(data, key, iv, padding_byte)
+
+    if mode == CFB:
+        if crypt_type == des.DECRYPT:
+            return cfb_decrypt(data, key, iv)
+
+        return cfb_encrypt(data, key, iv)
+
+    raise ValueError("Unknown mode " + str(mode) + "\n")
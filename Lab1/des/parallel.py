@@ -0,0 +1,157 @@
+import concurrent.futures
+import mmap
+import os
+
+import Lab1.des.des as des
+import Lab1.des.key_schedule as key_schedule
+import Lab1.des.modes as modes
+
+
+DEFAULT_SEGMENT_SIZE = 4 * 1024 * 1024
+
+BLOCK_SIZE = modes.BLOCK_SIZE
+
+
+def _crypt_segment(
+    input_path, output_path, start, length, crypt_type, key, mode, nonce
+):
+    """
+        Worker task: crypts one segment of input file straight into the
+        memory mapped output file
+
+    :return: number of written bytes
+    """
+    with open(input_path, "rb") as input_file, mmap.mmap(
+        input_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as source:
+        data = source[start : start + length]
+
+    if mode == modes.CTR:
+        crypted = modes.ctr_crypt(data, key, nonce, start)
+    else:
+        crypted = des.crypt(data, crypt_type, key)
+
+    with open(output_path, "r+b") as output_file, mmap.mmap(
+        output_file.fileno(), 0
+    ) as destination:
+        destination[start : start + len(crypted)] = crypted
+
+    return len(crypted)
+
+
+def crypt_file(
+    input_path,
+    output_path,
+    crypt_type,
+    key,
+    mode=modes.ECB,
+    nonce=None,
+    workers=None,
+    segment_size=DEFAULT_SEGMENT_SIZE,
+):
+    """
+        Crypts file using all cores. Input is split into block aligned
+        segments, every worker process crypts its segment from memory mapped
+        input into memory mapped output.
+
+    :param input_path: path to file to crypt
+    :param output_path: path to result file, overwritten
+    :param crypt_type: ENCRYPT or DECRYPT
+    :param key: key to crypt with, string or DESKey
+    :param mode: ECB or CTR
+    :param nonce: initial counter for CTR mode
+    :param workers: number of processes, number of CPUs by default
+    :param segment_size: size of data crypted by one task
+    :return: size of output file
+    """
+    if mode not in (modes.ECB, modes.CTR):
+        raise ValueError("Only ECB and CTR modes can be crypted in parallel\n")
+
+    if mode == modes.CTR and nonce is None:
+        raise ValueError("IV is required for this mode\n")
+
+    size = os.path.getsize(input_path)
+    output_size = size
+    if mode == modes.ECB and size % BLOCK_SIZE != 0:
+        if crypt_type == des.DECRYPT:
+            raise ValueError(
+                "Invalid data length, data must be a multiple of "
+                + str(BLOCK_SIZE)
+                + " bytes\n"
+            )
+
+        output_size += BLOCK_SIZE - size % BLOCK_SIZE
+
+    with open(output_path, "wb") as output_file:
+        output_file.truncate(output_size)
+
+    if size == 0:
+        return output_size
+
+    # key schedule is computed once and pickled to workers with every task
+    key = key_schedule.get_key(key)
+    segment_size = max(BLOCK_SIZE, segment_size - segment_size % BLOCK_SIZE)
+    segments = [
+        (start, min(segment_size, size - start))
+        for start in range(0, size, segment_size)
+    ]
+
+    if len(segments) == 1 or workers == 1:
+        for start, length in segments:
+            _crypt_segment(
+                input_path,
+                output_path,
+                start,
+                length,
+                crypt_type,
+                key,
+                mode,
+                nonce,
+            )
+
+        return output_size
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        futures = [
+            executor.submit(
+                _crypt_segment,
+                input_path,
+                output_path,
+                start,
+                length,
+                crypt_type,
+                key,
+                mode,
+                nonce,
+            )
+            for start, length in segments
+        ]
+
+        for future in futures:
+            future.result()
+
+    return output_size
+
+
+def encrypt_file(input_path, output_path, key, **kwargs):
+    """
+        Encrypts file in parallel, see crypt_file
+
+    :param input_path: path to file to encrypt
+    :param output_path: path to encrypted file
+    :param key: key to encrypt with, string or DESKey
+    :return: size of output file
+    """
+    return crypt_file(input_path, output_path, des.ENCRYPT, key, **kwargs)
+
+
+def decrypt_file(input_path, output_path, key, **kwargs):
+    """
+        Decrypts file in parallel, see crypt_file
+
+    :param input_path: path to file to decrypt
+    :param output_path: path to decrypted file
+    :param key: key to decrypt with, string or DESKey
+    :return: size of output file
+    """
+    return crypt_file(input_path, output_path, des.DECRYPT, key, **kwargs)
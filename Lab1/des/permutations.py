@@ -0,0 +1,71 @@
+import Lab1.des.constants as constants
+
+
+def build_byte_tables(table, input_width):
+    """
+        Splits permutation into per input byte lookup tables. Entry k[v] holds
+        every output bit that comes from byte k (counting from the least
+        significant one) when that byte equals v.
+
+    :param table: permutation table from constants
+    :param input_width: number of bits in permuted value
+    :return: list of 256-entry lists of integers
+    """
+    output_width = len(table)
+    byte_tables = []
+
+    for byte_index in range((input_width + 7) // 8):
+        byte_table = []
+        for byte_value in range(256):
+            value = 0
+            for position, index in enumerate(table):
+                bit = input_width - 1 - index - 8 * byte_index
+                if 0 <= bit < 8 and byte_value & (1 << bit):
+                    value |= 1 << (output_width - 1 - position)
+
+            byte_table.append(value)
+
+        byte_tables.append(byte_table)
+
+    return byte_tables
+
+
+def compile_permutation(table, input_width):
+    """
+        Compiles permutation table into function on integers. The function
+        ORs one byte table lookup per input byte, so no bits arrays are built.
+
+    :param table: permutation table from constants
+    :param input_width: number of bits in permuted value
+    :return: function taking and returning integer, byte tables are stored
+        in its byte_tables attribute
+    """
+    byte_tables = build_byte_tables(table, input_width)
+
+    lookups = ["t0[value & 0xFF]"]
+    for byte_index in range(1, len(byte_tables)):
+        lookups.append(
+            "t{0}[(value >> {1}) & 0xFF]".format(byte_index, 8 * byte_index)
+        )
+
+    namespace = {
+        "t" + str(byte_index): byte_table
+        for byte_index, byte_table in enumerate(byte_tables)
+    }
+    exec(
+        "def permute(value):\n    return " + " | ".join(lookups) + "\n",
+        namespace,
+    )
+
+    permute = namespace["permute"]
+    permute.byte_tables = byte_tables
+
+    return permute
+
+
+initial_permutation = compile_permutation(constants.initial_permutation, 64)
+final_permutation = compile_permutation(constants.final_permutation, 64)
+permuted_choice_1 = compile_permutation(constants.permuted_choice_1, 64)
+permuted_choice_2 = compile_permutation(constants.permuted_choice_2, 56)
+expansion_function = compile_permutation(constants.expansion_function, 32)
+permutation = compile_permutation(constants.permutation, 32)
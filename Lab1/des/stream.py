@@ -0,0 +1,169 @@
+import Lab1.des.des as des
+import Lab1.des.modes as modes
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+BLOCK_SIZE = modes.BLOCK_SIZE
+
+
+def iter_chunks(reader, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+        Reads file object by chunks
+
+    :param reader: binary file object opened for reading
+    :param chunk_size: maximum size of chunk
+    :return: generator of bytes chunks
+    """
+    while True:
+        chunk = reader.read(chunk_size)
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def iter_crypt(
+    chunks, crypt_type, key, mode=modes.ECB, iv=None, padding_byte=" "
+):
+    """
+        Crypts sequence of chunks. Partial blocks are carried to the next
+        chunk, padding is only added at the end of the stream.
+
+    :param chunks: iterable of bytes chunks
+    :param crypt_type: ENCRYPT or DECRYPT
+    :param key: key to crypt with, string or DESKey
+    :param mode: ECB, CBC, CFB, OFB or CTR
+    :param iv: initialization vector or initial counter, not used for ECB
+    :param padding_byte: byte to pad data with in ECB and CBC encryption
+    :return: generator of crypted bytes chunks
+    """
+    if mode != modes.ECB and iv is None:
+        raise ValueError("IV is required for this mode\n")
+
+    if mode == modes.CTR:
+        offset = 0
+        for chunk in chunks:
+            yield modes.ctr_crypt(chunk, key, iv, offset)
+            offset += len(chunk)
+
+        return
+
+    tail = b""
+    for chunk in chunks:
+        data = tail + bytes(chunk)
+        length = len(data) - len(data) % BLOCK_SIZE
+        tail = data[length:]
+
+        if length:
+            crypted = modes.crypt(data[:length], crypt_type, key, mode, iv)
+            iv = _next_iv(mode, crypt_type, data[:length], crypted, iv)
+            yield crypted
+
+    if not tail:
+        return
+
+    if mode in (modes.ECB, modes.CBC) and crypt_type == des.DECRYPT:
+        raise ValueError(
+            "Invalid data length, data must be a multiple of "
+            + str(BLOCK_SIZE)
+            + " bytes\n"
+        )
+
+    yield modes.crypt(tail, crypt_type, key, mode, iv, padding_byte)
+
+
+def _next_iv(mode, crypt_type, data, crypted, iv):
+    if mode == modes.CBC or mode == modes.CFB:
+        if crypt_type == des.DECRYPT:
+            return data[-BLOCK_SIZE:]
+
+        return crypted[-BLOCK_SIZE:]
+
+    if mode == modes.OFB:
+        return bytes(
+            a ^ b for a, b in zip(data[-BLOCK_SIZE:], crypted[-BLOCK_SIZE:])
+        )
+
+    return iv
+
+
+def crypt_stream(
+    reader,
+    writer,
+    crypt_type,
+    key,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    mode=modes.ECB,
+    iv=None,
+    padding_byte=" ",
+):
+    """
+        Crypts file object into another one keeping only one chunk in memory
+
+    :param reader: binary file object opened for reading
+    :param writer: binary file object opened for writing
+    :param crypt_type: ENCRYPT or DECRYPT
+    :param key: key to crypt with, string or DESKey
+    :param chunk_size: size of chunks read from reader
+    :param mode: ECB, CBC, CFB, OFB or CTR
+    :param iv: initialization vector or initial counter, not used for ECB
+    :param padding_byte: byte to pad data with in ECB and CBC encryption
+    :return: number of written bytes
+    """
+    written = 0
+    for crypted in iter_crypt(
+        iter_chunks(reader, chunk_size),
+        crypt_type,
+        key,
+        mode,
+        iv,
+        padding_byte,
+    ):
+        writer.write(crypted)
+        written += len(crypted)
+
+    return written
+
+
+def encrypt_stream(
+    reader,
+    writer,
+    key,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    mode=modes.ECB,
+    iv=None,
+    padding_byte=" ",
+):
+    """
+        Encrypts file object into another one with constant memory
+
+    :param reader: binary file object opened for reading
+    :param writer: binary file object opened for writing
+    :param key: key to encrypt with, string or DESKey
+    :param chunk_size: size of chunks read from reader
+    :param mode: ECB, CBC, CFB, OFB or CTR
+    :param iv: initialization vector or initial counter, not used for ECB
+    :param padding_byte: byte to pad data with in ECB and CBC
+    :return: number of written bytes
+    """
+    return crypt_stream(
+        reader, writer, des.ENCRYPT, key, chunk_size, mode, iv, padding_byte
+    )
+
+
+def decrypt_stream(
+    reader, writer, key, chunk_size=DEFAULT_CHUNK_SIZE, mode=modes.ECB, iv=None
+):
+    """
+        Decrypts file object into another one with constant memory
+
+    :param reader: binary file object opened for reading
+    :param writer: binary file object opened for writing
+    :param key: key to decrypt with, string or DESKey
+    :param chunk_size: size of chunks read from reader
+    :param mode: ECB, CBC, CFB, OFB or CTR
+    :param iv: initialization vector or initial counter used for encryption
+    :return: number of written bytes
+    """
+    return crypt_stream(reader, writer, des.DECRYPT, key, chunk_size, mode, iv)
@@ -0,0 +1,36 @@
+import Lab1.des.constants as constants
+
+
+def build_sp_boxes():
+    """
+        Builds combined S-box and permutation tables for the integer engine.
+        Entry j[v] is the output of S-box j for the six bits v, already placed
+        in the 32-bit word and pushed through the P permutation.
+
+    :return: eight lists of 64 32-bit integers
+    """
+    output_positions = [0] * 32
+    for position, index in enumerate(constants.permutation):
+        output_positions[index] = position
+
+    sp_boxes = []
+    for j, s_box in enumerate(constants.s_boxes):
+        table = []
+        for six_bits in range(64):
+            m = ((six_bits >> 4) & 2) | (six_bits & 1)
+            n = (six_bits >> 1) & 15
+            v = s_box[(m << 4) + n]
+
+            value = 0
+            for k in range(4):
+                if v & (8 >> k):
+                    value |= 1 << (31 - output_positions[4 * j + k])
+
+            table.append(value)
+
+        sp_boxes.append(table)
+
+    return sp_boxes
+
+
+sp_boxes = build_sp_boxes()
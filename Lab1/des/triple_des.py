@@ -1,43 +1,60 @@
 import Lab1.des.des as des
 
 
-def encrypt(data, first_key, second_key, third_key=None):
+# every pass encrypts, kept as default for data encrypted earlier
+EEE = 0
+# encrypt-decrypt-encrypt as in the standard
+EDE = 1
+
+
+def _encryption_passes(first_key, second_key, third_key, keying):
+    if third_key is None:
+        third_key = first_key
+
+    second_type = des.DECRYPT if keying == EDE else des.ENCRYPT
+
+    return [
+        (des.ENCRYPT, first_key),
+        (second_type, second_key),
+        (des.ENCRYPT, third_key),
+    ]
+
+
+def encrypt(data, first_key, second_key, third_key=None, keying=EEE):
     """
         Encrypts passed data with passed keys
 
     :param data: data to encrypt
     :param first_key: first key to encrypt with
     :param second_key: second key to encrypt with
-    :param third_key: second key to encrypt with
+    :param third_key: third key to encrypt with, first key if not passed
+    :param keying: EEE or EDE
     :return: encrypted data as bytes
     """
 
-    if third_key is None:
-        third_key = first_key
-
-    first_encryption = des.encrypt(data, first_key)
-    second_encryption = des.encrypt(first_encryption, second_key)
-    third_encryption = des.encrypt(second_encryption, third_key)
-
-    return third_encryption
+    return des.crypt_multiple(
+        data, _encryption_passes(first_key, second_key, third_key, keying)
+    )
 
 
-def decrypt(encrypted_data, first_key, second_key, third_key=None):
+def decrypt(encrypted_data, first_key, second_key, third_key=None, keying=EEE):
     """
         Decrypts passed data with passed keys
 
     :param encrypted_data: data to decrypt
     :param first_key: first key to decrypt with
     :param second_key: second key to decrypt with
-    :param third_key: second key to decrypt with
+    :param third_key: third key to decrypt with, first key if not passed
+    :param keying: EEE or EDE
     :return: decrypted data as bytes
     """
 
-    if third_key is None:
-        third_key = first_key
-
-    first_decryption = des.decrypt(encrypted_data, third_key)
-    second_decryption = des.decrypt(first_decryption, second_key)
-    third_decryption = des.decrypt(second_decryption, first_key)
+    passes = [
+        (des.DECRYPT if crypt_type == des.ENCRYPT else des.ENCRYPT, key)
+        for crypt_type, key in _encryption_passes(
+            first_key, second_key, third_key, keying
+        )
+    ]
+    passes.reverse()
 
-    return third_decryption
+    return des.crypt_multiple(encrypted_data, passes)
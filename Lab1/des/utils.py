@@ -1,4 +1,5 @@
 import Lab1.des.constants as constants
+import Lab1.des.permutations as permutations
 
 
 def string_to_bits_list(string):
@@ -62,11 +63,14 @@ def generate_sub_keys(key_string):
     """
         Generates sub keys for Feistel function in DES
 
-    :param key_string: encryption key passed as string
+    :param key_string: encryption key passed as string or bytes
     :return: sub_keys for Feistel function in DES
     """
 
-    bites_key = string_to_bits_list(key_string)
+    if isinstance(key_string, str):
+        bites_key = string_to_bits_list(key_string)
+    else:
+        bites_key = bytes_to_bits_list(key_string)
 
     c_block = [bites_key[constants.permuted_choice_1[i]] for i in range(28)]
     d_block = [
@@ -96,6 +100,41 @@ def generate_sub_keys(key_string):
     return sub_keys
 
 
+def generate_int_sub_keys(key_string):
+    """
+        Generates sub keys for the integer DES engine. Works on 28-bit
+        integer halves with compiled PC-1 and PC-2 permutations,
+        generate_sub_keys is the reference bits array version.
+
+    :param key_string: encryption key passed as string or bytes
+    :return: sub_keys as 48-bit integers
+    """
+    key = key_string
+    if isinstance(key, str):
+        key = key.encode("ascii")
+    if len(key) < 8:
+        raise ValueError("Invalid key length, key must be 8 bytes\n")
+
+    c_d_vector = permutations.permuted_choice_1(int.from_bytes(key[:8], "big"))
+    c_block = c_d_vector >> 28
+    d_block = c_d_vector & 0xFFFFFFF
+
+    sub_keys = []
+    for rotation in constants.bits_rotation_table:
+        c_block = ((c_block << rotation) | (c_block >> (28 - rotation))) & (
+            0xFFFFFFF
+        )
+        d_block = ((d_block << rotation) | (d_block >> (28 - rotation))) & (
+            0xFFFFFFF
+        )
+
+        sub_keys.append(
+            permutations.permuted_choice_2((c_block << 28) | d_block)
+        )
+
+    return sub_keys
+
+
 def add_padding_to_data(data, block_size, padding_byte=" "):
     """
         Adds the padding to data to be a multiple of block size
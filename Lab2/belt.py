@@ -0,0 +1,738 @@
+import functools
+import struct
+
+
+ENCRYPT = 0
+DECRYPT = 1
+
+ECB = 0
+CTR = 4
+
+BLOCK_SIZE = 16
+KEY_SIZE = 32
+
+CACHE_SIZE = 128
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+MASK_32 = 0xFFFFFFFF
+MASK_128 = (1 << 128) - 1
+
+H = [
+    0xB1,
+    0x94,
+    0xBA,
+    0xC8,
+    0x0A,
+    0x08,
+    0xF5,
+    0x3B,
+    0x36,
+    0x6D,
+    0x00,
+    0x8E,
+    0x58,
+    0x4A,
+    0x5D,
+    0xE4,
+    0x85,
+    0x04,
+    0xFA,
+    0x9D,
+    0x1B,
+    0xB6,
+    0xC7,
+    0xAC,
+    0x25,
+    0x2E,
+    0x72,
+    0xC2,
+    0x02,
+    0xFD,
+    0xCE,
+    0x0D,
+    0x5B,
+    0xE3,
+    0xD6,
+    0x12,
+    0x17,
+    0xB9,
+    0x61,
+    0x81,
+    0xFE,
+    0x67,
+    0x86,
+    0xAD,
+    0x71,
+    0x6B,
+    0x89,
+    0x0B,
+    0x5C,
+    0xB0,
+    0xC0,
+    0xFF,
+    0x33,
+    0xC3,
+    0x56,
+    0xB8,
+    0x35,
+    0xC4,
+    0x05,
+    0xAE,
+    0xD8,
+    0xE0,
+    0x7F,
+    0x99,
+    0xE1,
+    0x2B,
+    0xDC,
+    0x1A,
+    0xE2,
+    0x82,
+    0x57,
+    0xEC,
+    0x70,
+    0x3F,
+    0xCC,
+    0xF0,
+    0x95,
+    0xEE,
+    0x8D,
+    0xF1,
+    0xC1,
+    0xAB,
+    0x76,
+    0x38,
+    0x9F,
+    0xE6,
+    0x78,
+    0xCA,
+    0xF7,
+    0xC6,
+    0xF8,
+    0x60,
+    0xD5,
+    0xBB,
+    0x9C,
+    0x4F,
+    0xF3,
+    0x3C,
+    0x65,
+    0x7B,
+    0x63,
+    0x7C,
+    0x30,
+    0x6A,
+    0xDD,
+    0x4E,
+    0xA7,
+    0x79,
+    0x9E,
+    0xB2,
+    0x3D,
+    0x31,
+    0x3E,
+    0x98,
+    0xB5,
+    0x6E,
+    0x27,
+    0xD3,
+    0xBC,
+    0xCF,
+    0x59,
+    0x1E,
+    0x18,
+    0x1F,
+    0x4C,
+    0x5A,
+    0xB7,
+    0x93,
+    0xE9,
+    0xDE,
+    0xE7,
+    0x2C,
+    0x8F,
+    0x0C,
+    0x0F,
+    0xA6,
+    0x2D,
+    0xDB,
+    0x49,
+    0xF4,
+    0x6F,
+    0x73,
+    0x96,
+    0x47,
+    0x06,
+    0x07,
+    0x53,
+    0x16,
+    0xED,
+    0x24,
+    0x7A,
+    0x37,
+    0x39,
+    0xCB,
+    0xA3,
+    0x83,
+    0x03,
+    0xA9,
+    0x8B,
+    0xF6,
+    0x92,
+    0xBD,
+    0x9B,
+    0x1C,
+    0xE5,
+    0xD1,
+    0x41,
+    0x01,
+    0x54,
+    0x45,
+    0xFB,
+    0xC9,
+    0x5E,
+    0x4D,
+    0x0E,
+    0xF2,
+    0x68,
+    0x20,
+    0x80,
+    0xAA,
+    0x22,
+    0x7D,
+    0x64,
+    0x2F,
+    0x26,
+    0x87,
+    0xF9,
+    0x34,
+    0x90,
+    0x40,
+    0x55,
+    0x11,
+    0xBE,
+    0x32,
+    0x97,
+    0x13,
+    0x43,
+    0xFC,
+    0x9A,
+    0x48,
+    0xA0,
+    0x2A,
+    0x88,
+    0x5F,
+    0x19,
+    0x4B,
+    0x09,
+    0xA1,
+    0x7E,
+    0xCD,
+    0xA4,
+    0xD0,
+    0x15,
+    0x44,
+    0xAF,
+    0x8C,
+    0xA5,
+    0x84,
+    0x50,
+    0xBF,
+    0x66,
+    0xD2,
+    0xE8,
+    0x8A,
+    0xA2,
+    0xD7,
+    0x46,
+    0x52,
+    0x42,
+    0xA8,
+    0xDF,
+    0xB3,
+    0x69,
+    0x74,
+    0xC5,
+    0x51,
+    0xEB,
+    0x23,
+    0x29,
+    0x21,
+    0xD4,
+    0xEF,
+    0xD9,
+    0xB4,
+    0x3A,
+    0x62,
+    0x28,
+    0x75,
+    0x91,
+    0x14,
+    0x10,
+    0xEA,
+    0x77,
+    0x6C,
+    0xDA,
+    0x1D,
+]
+
+KEY_INDEX = [[(7 * i + j) % 8 for j in range(7)] for i in range(8)]
+
+_block_struct = struct.Struct("<4I")
+
+
+def build_g_tables(rotation):
+    """
+        Builds tables of G transformation: H substitution of every byte of
+        the word followed by rotation. Entry k[v] is the rotated H[v] placed
+        into byte k, so G is XOR of four lookups.
+
+    :param rotation: number of bits to rotate left by
+    :return: four lists of 256 32-bit integers
+    """
+    tables = []
+    for byte_index in range(4):
+        table = []
+        for value in range(256):
+            word = H[value] << (8 * byte_index)
+            table.append(
+                ((word << rotation) | (word >> (32 - rotation))) & MASK_32
+            )
+
+        tables.append(table)
+
+    return tables
+
+
+G_5 = build_g_tables(5)
+G_13 = build_g_tables(13)
+G_21 = build_g_tables(21)
+
+
+class BeltKey(object):
+    """
+        Belt key with round keys laid out in the order they are used
+    """
+
+    def __init__(self, key):
+        key = bytes(key)
+        if len(key) != KEY_SIZE:
+            raise ValueError(
+                "Invalid key length, key must be " + str(KEY_SIZE) + " bytes\n"
+            )
+
+        self.key = key
+        words = struct.unpack("<8I", key)
+
+        self.encryption_keys = tuple(
+            tuple(words[index] for index in KEY_INDEX[i]) + (i + 1,)
+            for i in range(8)
+        )
+        self.decryption_keys = tuple(
+            tuple(words[index] for index in reversed(KEY_INDEX[7 - i]))
+            + (8 - i,)
+            for i in range(8)
+        )
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _get_cached_key(key):
+    return BeltKey(key)
+
+
+def get_key(key):
+    """
+        Returns key context for passed key, reusing recently used ones
+
+    :param key: 32 bytes or BeltKey
+    :return: BeltKey
+    """
+    if isinstance(key, BeltKey):
+        return key
+
+    return _get_cached_key(bytes(key))
+
+
+def _crypt_words(a, b, c, d, round_keys, crypt_type):
+    """
+        Runs Belt rounds over block given as four 32-bit words. Encryption
+        and decryption rounds differ only in the final shuffle of words.
+
+    :param round_keys: BeltKey.encryption_keys or BeltKey.decryption_keys
+    :param crypt_type: ENCRYPT or DECRYPT
+    :return: four crypted words
+    """
+    decrypt = crypt_type == DECRYPT
+    g5_0, g5_1, g5_2, g5_3 = G_5
+    g13_0, g13_1, g13_2, g13_3 = G_13
+    g21_0, g21_1, g21_2, g21_3 = G_21
+
+    for k0, k1, k2, k3, k4, k5, k6, i in round_keys:
+        x = (a + k0) & MASK_32
+        b ^= (
+            g5_0[x & 0xFF]
+            ^ g5_1[(x >> 8) & 0xFF]
+            ^ g5_2[(x >> 16) & 0xFF]
+            ^ g5_3[x >> 24]
+        )
+        x = (d + k1) & MASK_32
+        c ^= (
+            g21_0[x & 0xFF]
+            ^ g21_1[(x >> 8) & 0xFF]
+            ^ g21_2[(x >> 16) & 0xFF]
+            ^ g21_3[x >> 24]
+        )
+        x = (b + k2) & MASK_32
+        a = (
+            a
+            - (
+                g13_0[x & 0xFF]
+                ^ g13_1[(x >> 8) & 0xFF]
+                ^ g13_2[(x >> 16) & 0xFF]
+                ^ g13_3[x >> 24]
+            )
+        ) & MASK_32
+        x = (b + c + k3) & MASK_32
+        e = (
+            g21_0[x & 0xFF]
+            ^ g21_1[(x >> 8) & 0xFF]
+            ^ g21_2[(x >> 16) & 0xFF]
+            ^ g21_3[x >> 24]
+            ^ i
+        )
+        b = (b + e) & MASK_32
+        c = (c - e) & MASK_32
+        x = (c + k4) & MASK_32
+        d = (
+            d
+            + (
+                g13_0[x & 0xFF]
+                ^ g13_1[(x >> 8) & 0xFF]
+                ^ g13_2[(x >> 16) & 0xFF]
+                ^ g13_3[x >> 24]
+            )
+        ) & MASK_32
+        x = (a + k5) & MASK_32
+        b ^= (
+            g21_0[x & 0xFF]
+            ^ g21_1[(x >> 8) & 0xFF]
+            ^ g21_2[(x >> 16) & 0xFF]
+            ^ g21_3[x >> 24]
+        )
+        x = (d + k6) & MASK_32
+        c ^= (
+            g5_0[x & 0xFF]
+            ^ g5_1[(x >> 8) & 0xFF]
+            ^ g5_2[(x >> 16) & 0xFF]
+            ^ g5_3[x >> 24]
+        )
+        if decrypt:
+            a, b, c, d = c, a, d, b
+        else:
+            a, b, c, d = b, d, a, c
+
+    return a, b, c, d
+
+
+def encrypt_words(a, b, c, d, round_keys):
+    """
+        Encrypts block given as four 32-bit words
+
+    :param round_keys: BeltKey.encryption_keys
+    :return: four encrypted words
+    """
+    a, b, c, d = _crypt_words(a, b, c, d, round_keys, ENCRYPT)
+
+    return b, d, a, c
+
+
+def decrypt_words(a, b, c, d, round_keys):
+    """
+        Decrypts block given as four 32-bit words
+
+    :param round_keys: BeltKey.decryption_keys
+    :return: four decrypted words
+    """
+    a, b, c, d = _crypt_words(a, b, c, d, round_keys, DECRYPT)
+
+    return c, a, d, b
+
+
+def encrypt16(block, key):
+    """
+        Encrypts one block, same as stb_encrypt16
+
+    :param block: 16 bytes
+    :param key: 32 bytes or BeltKey
+    :return: 16 encrypted bytes
+    """
+    return _block_struct.pack(
+        *encrypt_words(
+            *_block_struct.unpack(block), get_key(key).encryption_keys
+        )
+    )
+
+
+def decrypt16(block, key):
+    """
+        Decrypts one block, same as stb_decrypt16
+
+    :param block: 16 bytes
+    :param key: 32 bytes or BeltKey
+    :return: 16 decrypted bytes
+    """
+    return _block_struct.pack(
+        *decrypt_words(
+            *_block_struct.unpack(block), get_key(key).decryption_keys
+        )
+    )
+
+
+def add_padding_to_data(data):
+    """
+        Pads data with zero bytes to be a multiple of block size, as the
+        command line tool does
+
+    :param data: data to add padding to
+    :return: data with padding
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    if len(data) % BLOCK_SIZE == 0:
+        return bytes(data)
+
+    return bytes(data) + bytes(BLOCK_SIZE - len(data) % BLOCK_SIZE)
+
+
+def crypt(data, crypt_type, key):
+    """
+        Crypts data in ECB mode
+
+    :param data: data to crypt, padded with zero bytes when encrypting
+    :param crypt_type: ENCRYPT or DECRYPT
+    :param key: 32 bytes or BeltKey
+    :return: crypted data as bytes
+    """
+    data = add_padding_to_data(data)
+
+    key = get_key(key)
+    if crypt_type == DECRYPT:
+        function = decrypt_words
+        round_keys = key.decryption_keys
+    else:
+        function = encrypt_words
+        round_keys = key.encryption_keys
+
+    words = []
+    for block in _block_struct.iter_unpack(data):
+        words.extend(function(*block, round_keys))
+
+    return struct.pack("<" + str(len(words)) + "I", *words)
+
+
+def encrypt(data, key):
+    """
+        Encrypts passed data with passed key
+
+    :param data: data to encrypt
+    :param key: 32 bytes or BeltKey
+    :return: encrypted data as bytes
+    """
+    return crypt(data, ENCRYPT, key)
+
+
+def decrypt(encrypted_data, key):
+    """
+        Decrypts passed data with passed key
+
+    :param encrypted_data: data to decrypt
+    :param key: 32 bytes or BeltKey
+    :return: decrypted data as bytes
+    """
+    return crypt(encrypted_data, DECRYPT, key)
+
+
+def ctr_keystream(key, iv, offset, length):
+    """
+        Generates CTR key stream for any byte range. As in STB 34.101.31 the
+        counter starts from encrypted IV and block i uses counter + i + 1,
+        so range is computed without preceding blocks.
+
+    :param key: 32 bytes or BeltKey
+    :param iv: 16 bytes synchronization message
+    :param offset: position of the first byte in the stream
+    :param length: number of bytes
+    :return: key stream bytes
+    """
+    key = get_key(key)
+    round_keys = key.encryption_keys
+
+    counter = int.from_bytes(encrypt16(iv, key), "little")
+    first_block = offset // BLOCK_SIZE
+    last_block = (offset + length + BLOCK_SIZE - 1) // BLOCK_SIZE
+
+    words = []
+    for i in range(first_block, last_block):
+        value = (counter + i + 1) & MASK_128
+        words.extend(
+            encrypt_words(
+                value & MASK_32,
+                (value >> 32) & MASK_32,
+                (value >> 64) & MASK_32,
+                value >> 96,
+                round_keys,
+            )
+        )
+
+    stream = struct.pack("<" + str(len(words)) + "I", *words)
+
+    skip = offset % BLOCK_SIZE
+    return stream[skip : skip + length]
+
+
+def ctr_crypt(data, key, iv, offset=0):
+    """
+        Encrypts or decrypts data in CTR mode. No padding is needed, and data
+        may be a part of a longer message starting at offset.
+
+    :param data: data to crypt
+    :param key: 32 bytes or BeltKey
+    :param iv: 16 bytes synchronization message
+    :param offset: position of data in the whole message
+    :return: crypted data as bytes
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    length = len(data)
+    stream = ctr_keystream(key, iv, offset, length)
+
+    return (
+        int.from_bytes(data, "big") ^ int.from_bytes(stream, "big")
+    ).to_bytes(length, "big")
+
+
+def iter_crypt(chunks, crypt_type, key, mode=ECB, iv=None):
+    """
+        Crypts sequence of chunks. Partial blocks are carried to the next
+        chunk, padding is only added at the end of the stream.
+
+    :param chunks: iterable of bytes chunks
+    :param crypt_type: ENCRYPT or DECRYPT
+    :param key: 32 bytes or BeltKey
+    :param mode: ECB or CTR
+    :param iv: synchronization message for CTR
+    :return: generator of crypted bytes chunks
+    """
+    key = get_key(key)
+
+    if mode == CTR:
+        offset = 0
+        for chunk in chunks:
+            yield ctr_crypt(chunk, key, iv, offset)
+            offset += len(chunk)
+
+        return
+
+    tail = b""
+    for chunk in chunks:
+        data = tail + bytes(chunk)
+        length = len(data) - len(data) % BLOCK_SIZE
+        tail = data[length:]
+
+        if length:
+            yield crypt(data[:length], crypt_type, key)
+
+    if tail:
+        if crypt_type == DECRYPT:
+            raise ValueError(
+                "Invalid data length, data must be a multiple of "
+                + str(BLOCK_SIZE)
+                + " bytes\n"
+            )
+
+        yield crypt(tail, crypt_type, key)
+
+
+def crypt_stream(
+    reader,
+    writer,
+    crypt_type,
+    key,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    mode=ECB,
+    iv=None,
+):
+    """
+        Crypts file object into another one keeping only one chunk in memory
+
+    :param reader: binary file object opened for reading
+    :param writer: binary file object opened for writing
+    :param crypt_type: ENCRYPT or DECRYPT
+    :param key: 32 bytes or BeltKey
+    :param chunk_size: size of chunks read from reader
+    :param mode: ECB or CTR
+    :param iv: synchronization message for CTR
+    :return: number of written bytes
+    """
+
+    def chunks():
+        while True:
+            chunk = reader.read(chunk_size)
+            if not chunk:
+                return
+
+            yield chunk
+
+    written = 0
+    for crypted in iter_crypt(chunks(), crypt_type, key, mode, iv):
+        writer.write(crypted)
+        written += len(crypted)
+
+    return written
+
+
+def encrypt_stream(
+    reader, writer, key, chunk_size=DEFAULT_CHUNK_SIZE, mode=ECB, iv=None
+):
+    """
+        Encrypts file object into another one with constant memory
+
+    :param reader: binary file object opened for reading
+    :param writer: binary file object opened for writing
+    :param key: 32 bytes or BeltKey
+    :param chunk_size: size of chunks read from reader
+    :param mode: ECB or CTR
+    :param iv: synchronization message for CTR
+    :return: number of written bytes
+    """
+    return crypt_stream(reader, writer, ENCRYPT, key, chunk_size, mode, iv)
+
+
+def decrypt_stream(
+    reader, writer, key, chunk_size=DEFAULT_CHUNK_SIZE, mode=ECB, iv=None
+):
+    """
+        Decrypts file object into another one with constant memory
+
+    :param reader: binary file object opened for reading
+    :param writer: binary file object opened for writing
+    :param key: 32 bytes or BeltKey
+    :param chunk_size: size of chunks read from reader
+    :param mode: ECB or CTR
+    :param iv: synchronization message used for encryption
+    :return: number of written bytes
+    """
+    return crypt_stream(reader, writer, DECRYPT, key, chunk_size, mode, iv)
+
+
+if __name__ == "__main__":
+    with open("stb/key", "rb") as key_file, open("stb/input", "rb") as file:
+        key = key_file.read()
+        block = file.read()
+
+    encrypted = encrypt16(block, key)
+    print(encrypted.hex())
+    print(decrypt16(encrypted, key) == block)
@@ -0,0 +1,219 @@
+import ctypes
+import hashlib
+import os
+import subprocess
+import tempfile
+
+import Lab2.belt as belt
+
+
+SOURCES = ["stb.c", "stb_bulk.c"]
+
+ENCRYPT = belt.ENCRYPT
+DECRYPT = belt.DECRYPT
+
+BLOCK_SIZE = belt.BLOCK_SIZE
+
+_library = None
+_loaded = False
+
+
+def _cache_directory():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+
+    return os.path.join(base, "mzi")
+
+
+def _build(directory):
+    """
+        Compiles C sources into shared library named by sources hash, so
+        it is only rebuilt when the sources change
+
+    :param directory: directory of C sources
+    :return: path to library or None if it cannot be built
+    """
+    digest = hashlib.sha256()
+    for source in SOURCES + ["stb.h"]:
+        with open(os.path.join(directory, source), "rb") as file:
+            digest.update(file.read())
+
+    cache_directory = _cache_directory()
+    path = os.path.join(
+        cache_directory, "libstb-" + digest.hexdigest()[:16] + ".so"
+    )
+    if os.path.exists(path):
+        return path
+
+    try:
+        os.makedirs(cache_directory, exist_ok=True)
+        handle, temporary_path = tempfile.mkstemp(
+            suffix=".so", dir=cache_directory
+        )
+        os.close(handle)
+    except OSError:
+        return None
+
+    try:
+        subprocess.run(
+            [os.environ.get("CC", "cc"), "-O2", "-shared", "-fPIC", "-o"]
+            + [temporary_path]
+            + [os.path.join(directory, source) for source in SOURCES],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        os.remove(temporary_path)
+        return None
+
+    os.replace(temporary_path, path)
+
+    return path
+
+
+def load():
+    """
+        Builds and loads native library on first use
+
+    :return: ctypes library or None when no compiler is available
+    """
+    global _library, _loaded
+
+    if _loaded:
+        return _library
+
+    _loaded = True
+
+    path = _build(os.path.dirname(os.path.abspath(__file__)))
+    if path is None:
+        return None
+
+    try:
+        library = ctypes.CDLL(path)
+    except OSError:
+        return None
+
+    for name in ("stb_encrypt_blocks", "stb_decrypt_blocks"):
+        function = getattr(library, name)
+        function.argtypes = [
+            ctypes.c_char_p,
+            ctypes.c_char_p,
+            ctypes.c_size_t,
+            ctypes.c_char_p,
+        ]
+        function.restype = None
+
+    library.stb_ctr_xor.argtypes = [
+        ctypes.c_char_p,
+        ctypes.c_char_p,
+        ctypes.c_size_t,
+        ctypes.c_char_p,
+        ctypes.c_size_t,
+        ctypes.c_char_p,
+    ]
+    library.stb_ctr_xor.restype = None
+
+    _library = library
+
+    return _library
+
+
+def is_available():
+    """
+        Checks whether native library can be used
+
+    :return: True if library is built and loaded
+    """
+    return load() is not None
+
+
+def crypt(data, crypt_type, key):
+    """
+        Crypts data in ECB mode with one native call for the whole buffer,
+        falls back to pure Python implementation
+
+    :param data: data to crypt, padded with zero bytes when encrypting
+    :param crypt_type: ENCRYPT or DECRYPT
+    :param key: 32 bytes or BeltKey
+    :return: crypted data as bytes
+    """
+    library = load()
+    if library is None:
+        return belt.crypt(data, crypt_type, key)
+
+    data = belt.add_padding_to_data(data)
+    key = belt.get_key(key).key
+
+    out = ctypes.create_string_buffer(len(data))
+    if crypt_type == DECRYPT:
+        function = library.stb_decrypt_blocks
+    else:
+        function = library.stb_encrypt_blocks
+
+    function(out, data, len(data) // BLOCK_SIZE, key)
+
+    return out.raw
+
+
+def encrypt(data, key):
+    """
+        Encrypts passed data with passed key
+
+    :param data: data to encrypt
+    :param key: 32 bytes or BeltKey
+    :return: encrypted data as bytes
+    """
+    return crypt(data, ENCRYPT, key)
+
+
+def decrypt(encrypted_data, key):
+    """
+        Decrypts passed data with passed key
+
+    :param encrypted_data: data to decrypt
+    :param key: 32 bytes or BeltKey
+    :return: decrypted data as bytes
+    """
+    return crypt(encrypted_data, DECRYPT, key)
+
+
+def ctr_crypt(data, key, iv, offset=0):
+    """
+        Encrypts or decrypts data in CTR mode with one native call, falls
+        back to pure Python implementation
+
+    :param data: data to crypt
+    :param key: 32 bytes or BeltKey
+    :param iv: 16 bytes synchronization message
+    :param offset: position of data in the whole message
+    :return: crypted data as bytes
+    """
+    library = load()
+    if library is None:
+        return belt.ctr_crypt(data, key, iv, offset)
+
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+
+    data = bytes(data)
+    key = belt.get_key(key)
+
+    counter = (
+        int.from_bytes(belt.encrypt16(iv, key), "little")
+        + offset // BLOCK_SIZE
+        + 1
+    ) & belt.MASK_128
+
+    out = ctypes.create_string_buffer(len(data))
+    library.stb_ctr_xor(
+        out,
+        data,
+        len(data),
+        counter.to_bytes(BLOCK_SIZE, "little"),
+        offset % BLOCK_SIZE,
+        key.key,
+    )
+
+    return out.raw
@@ -0,0 +1,63 @@
+#include <stddef.h>
+#include <stdint.h>
+#include <string.h>
+#include "stb.h"
+
+#define BLOCK_SIZE 16
+
+void stb_encrypt_blocks(uint8_t *out, const uint8_t *in, size_t count, const uint8_t *ks)
+{
+    size_t i;
+
+    for (i = 0; i < count; ++i)
+    {
+        stb_encrypt16(out + BLOCK_SIZE * i, in + BLOCK_SIZE * i, ks);
+    }
+}
+
+void stb_decrypt_blocks(uint8_t *out, const uint8_t *in, size_t count, const uint8_t *ks)
+{
+    size_t i;
+
+    for (i = 0; i < count; ++i)
+    {
+        stb_decrypt16(out + BLOCK_SIZE * i, in + BLOCK_SIZE * i, ks);
+    }
+}
+
+static void increment128(uint8_t *counter)
+{
+    size_t i;
+
+    for (i = 0; i < BLOCK_SIZE; ++i)
+    {
+        if (++counter[i] != 0)
+        {
+            break;
+        }
+    }
+}
+
+/* counter is the little endian counter of the block holding the first
+   byte, skip is the position of that byte in its block */
+void stb_ctr_xor(uint8_t *out, const uint8_t *in, size_t length, const uint8_t *counter, size_t skip, const uint8_t *ks)
+{
+    uint8_t block[BLOCK_SIZE];
+    uint8_t stream[BLOCK_SIZE];
+    size_t position = 0;
+    size_t i;
+
+    memcpy(block, counter, BLOCK_SIZE);
+
+    while (position < length)
+    {
+        stb_encrypt16(stream, block, ks);
+        increment128(block);
+
+        for (i = skip; i < BLOCK_SIZE && position < length; ++i, ++position)
+        {
+            out[position] = in[position] ^ stream[i];
+        }
+        skip = 0;
+    }
+}
@@ -0,0 +1,207 @@
+import hashlib
+import os
+
+import Lab1.des.modes as modes
+import Lab3.rsa as rsa
+
+
+HASH = hashlib.sha256
+HASH_SIZE = HASH().digest_size
+
+DES_KEY_SIZE = 8
+NONCE_SIZE = modes.BLOCK_SIZE
+
+
+def _modulus_size(n):
+    return (n.bit_length() + 7) // 8
+
+
+def _xor(data, mask):
+    return (
+        int.from_bytes(data, "big") ^ int.from_bytes(mask, "big")
+    ).to_bytes(len(data), "big")
+
+
+def mgf1(seed, length):
+    """
+        Mask generation function of RFC 8017
+
+    :param seed: bytes
+    :param length: mask length
+    :return: mask bytes
+    """
+    mask = bytearray()
+    counter = 0
+    while len(mask) < length:
+        mask += HASH(seed + counter.to_bytes(4, "big")).digest()
+        counter += 1
+
+    return bytes(mask[:length])
+
+
+def max_message_size(n):
+    """
+    :param n: modulus
+    :return: number of message bytes fitting in one block
+    """
+    return _modulus_size(n) - 2 * HASH_SIZE - 2
+
+
+def pad(message, size, label=b""):
+    """
+        EME-OAEP encoding of RFC 8017
+
+    :param message: bytes, at most size - 2 * HASH_SIZE - 2 long
+    :param size: modulus size in bytes
+    :param label: optional label bound to the message
+    :return: encoded block of size bytes
+    """
+    if len(message) > size - 2 * HASH_SIZE - 2:
+        raise ValueError("Message is too long for this key\n")
+
+    data_block = (
+        HASH(label).digest()
+        + bytes(size - len(message) - 2 * HASH_SIZE - 2)
+        + b"\x01"
+        + message
+    )
+    seed = os.urandom(HASH_SIZE)
+
+    masked_data_block = _xor(data_block, mgf1(seed, size - HASH_SIZE - 1))
+    masked_seed = _xor(seed, mgf1(masked_data_block, HASH_SIZE))
+
+    return b"\x00" + masked_seed + masked_data_block
+
+
+def unpad(block, size, label=b""):
+    """
+        EME-OAEP decoding of RFC 8017
+
+    :param block: encoded block of size bytes
+    :param size: modulus size in bytes
+    :param label: label passed to pad
+    :return: message bytes
+    """
+    masked_seed = block[1 : HASH_SIZE + 1]
+    masked_data_block = block[HASH_SIZE + 1 :]
+
+    seed = _xor(masked_seed, mgf1(masked_data_block, HASH_SIZE))
+    data_block = _xor(masked_data_block, mgf1(seed, size - HASH_SIZE - 1))
+
+    separator = data_block.find(b"\x01", HASH_SIZE)
+    if (
+        block[0] != 0
+        or data_block[:HASH_SIZE] != HASH(label).digest()
+        or separator < 0
+        or any(data_block[HASH_SIZE:separator])
+    ):
+        raise ValueError("Decryption error\n")
+
+    return data_block[separator + 1 :]
+
+
+def encrypt(data, e, n, label=b""):
+    """
+        Encrypts data in blocks, every block holds as many bytes as OAEP
+        padding leaves and is one exponentiation. Every encrypted block is
+        written as modulus size bytes.
+
+    :param data: bytes or string
+    :param e: public exponent
+    :param n: modulus
+    :param label: optional OAEP label
+    :return: encrypted bytes, multiple of modulus size
+    """
+    if isinstance(data, str):
+        data = data.encode("utf8")
+
+    size = _modulus_size(n)
+    step = max_message_size(n)
+    if step <= 0:
+        raise ValueError("Key is too short for OAEP\n")
+
+    encrypted_data = bytearray()
+    for start in range(0, max(len(data), 1), step):
+        block = pad(data[start : start + step], size, label)
+        value = pow(int.from_bytes(block, "big"), e, n)
+        encrypted_data += value.to_bytes(size, "big")
+
+    return bytes(encrypted_data)
+
+
+def decrypt(encrypted_data, d, n=None, label=b""):
+    """
+        Decrypts data encrypted by encrypt
+
+    :param encrypted_data: encrypted bytes
+    :param d: private exponent, or rsa.PrivateKey to decrypt with CRT
+    :param n: modulus, not needed for PrivateKey
+    :param label: OAEP label passed to encrypt
+    :return: decrypted bytes
+    """
+    if isinstance(d, rsa.PrivateKey):
+        n = d.n
+
+    size = _modulus_size(n)
+    if len(encrypted_data) % size != 0:
+        raise ValueError(
+            "Invalid data length, data must be a multiple of "
+            + str(size)
+            + " bytes\n"
+        )
+
+    decrypted_data = bytearray()
+    for start in range(0, len(encrypted_data), size):
+        value = int.from_bytes(encrypted_data[start : start + size], "big")
+        if value >= n:
+            raise ValueError("Decryption error\n")
+
+        if isinstance(d, rsa.PrivateKey):
+            value = d.power(value)
+        else:
+            value = pow(value, d, n)
+
+        block = value.to_bytes(size, "big")
+        decrypted_data += unpad(block, size, label)
+
+    return bytes(decrypted_data)
+
+
+def hybrid_encrypt(data, e, n):
+    """
+        Encrypts data of any size with random DES key in CTR mode. Key and
+        nonce are encrypted with RSA and written before the data.
+
+    :param data: bytes or string
+    :param e: public exponent
+    :param n: modulus
+    :return: modulus size bytes of wrapped key followed by encrypted data
+    """
+    if isinstance(data, str):
+        data = data.encode("utf8")
+
+    key = os.urandom(DES_KEY_SIZE)
+    nonce = os.urandom(NONCE_SIZE)
+
+    return encrypt(key + nonce, e, n) + modes.ctr_crypt(data, key, nonce)
+
+
+def hybrid_decrypt(encrypted_data, d, n=None):
+    """
+        Decrypts data encrypted by hybrid_encrypt
+
+    :param encrypted_data: encrypted bytes
+    :param d: private exponent, or rsa.PrivateKey
+    :param n: modulus, not needed for PrivateKey
+    :return: decrypted bytes
+    """
+    size = _modulus_size(d.n if isinstance(d, rsa.PrivateKey) else n)
+
+    wrapped_key = decrypt(encrypted_data[:size], d, n)
+    if len(wrapped_key) != DES_KEY_SIZE + NONCE_SIZE:
+        raise ValueError("Decryption error\n")
+
+    key = wrapped_key[:DES_KEY_SIZE]
+    nonce = wrapped_key[DES_KEY_SIZE:]
+
+    return modes.ctr_crypt(encrypted_data[size:], key, nonce)
@@ -0,0 +1,231 @@
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import threading
+
+import Lab3.rsa as rsa
+import Lab4.al_gamal as al_gamal
+import Lab4.safe_prime as safe_prime
+
+
+RSA_PRIME = rsa.RSA_PRIME
+SAFE_PRIME = safe_prime.SAFE_PRIME
+
+DEFAULT_LEVEL = 16
+DEFAULT_CONFIDENCE = 32
+
+
+def _generate(kind, bits, e, confidence):
+    if kind == RSA_PRIME:
+        return rsa.generate_prime(bits, e)
+
+    # pool workers are processes already
+    return al_gamal.find_prime(bits, confidence, workers=1)
+
+
+def _generate_task(kind, bits, e, confidence):
+    # worker task, safe prime search gives up when pool is stopped
+    if kind == SAFE_PRIME:
+        return safe_prime.search_task(bits, confidence, windows=None)
+
+    return _generate(kind, bits, e, confidence)
+
+
+class PrimePool(object):
+    """
+        Stock of primes of one kind and size. Worker processes fill it in
+        background up to level, so keys are made from ready primes and only
+        an empty pool makes primes on demand. With path the stock is kept in
+        a file between runs; primes are secret, so the file is readable by
+        owner only, and a taken prime is removed from it before it is used.
+    """
+
+    def __init__(
+        self,
+        kind,
+        bits,
+        level=DEFAULT_LEVEL,
+        path=None,
+        workers=None,
+        e=rsa.DEFAULT_EXPONENT,
+        confidence=DEFAULT_CONFIDENCE,
+    ):
+        self.kind = kind
+        self.bits = bits
+        self.level = level
+        self.path = path
+        self.workers = workers or os.cpu_count() or 1
+        self.e = e
+        self.confidence = confidence
+
+        self.primes = []
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+        self._load()
+
+    def __len__(self):
+        return len(self.primes)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _parameters(self):
+        # everything primes in the pool file were made for
+        parameters = {"kind": self.kind, "bits": self.bits}
+        if self.kind == RSA_PRIME:
+            parameters["e"] = self.e
+        else:
+            parameters["confidence"] = self.confidence
+
+        return parameters
+
+    def _load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return
+
+        with open(self.path, "r") as file:
+            state = json.load(file)
+
+        if any(
+            state.get(name) != value
+            for name, value in self._parameters().items()
+        ):
+            raise ValueError("Pool file was made for another pool\n")
+
+        self.primes = [int(prime, 16) for prime in state["primes"]]
+
+    def save(self):
+        """
+            Writes stock to path, does nothing without path
+        """
+        if self.path is None:
+            return
+
+        with self._lock:
+            state = self._parameters()
+            state["primes"] = [format(prime, "x") for prime in self.primes]
+
+            temporary_path = self.path + ".tmp"
+            handle = os.open(
+                temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+            )
+            with os.fdopen(handle, "w") as file:
+                json.dump(state, file)
+
+            os.replace(temporary_path, self.path)
+
+    def generate(self):
+        """
+            Makes a prime of the pool kind and size in this process
+        """
+        return _generate(self.kind, self.bits, self.e, self.confidence)
+
+    def get(self):
+        """
+            Takes a prime from the pool, or makes one if the pool is empty
+
+        :return: prime
+        """
+        with self._lock:
+            if self.primes:
+                prime = self.primes.pop()
+                self.hits += 1
+            else:
+                prime = None
+                self.misses += 1
+
+        self._wakeup.set()
+
+        if prime is None:
+            return self.generate()
+
+        self.save()
+
+        return prime
+
+    def _add(self, primes):
+        with self._lock:
+            self.primes.extend(primes)
+
+        self.save()
+
+    def fill(self):
+        """
+            Fills pool up to level in this process
+        """
+        while len(self.primes) < self.level:
+            self._add([self.generate()])
+
+    def _run(self):
+        stop = multiprocessing.Event()
+        executor = concurrent.futures.ProcessPoolExecutor(
+            self.workers,
+            initializer=safe_prime.init_worker,
+            initargs=(stop,),
+        )
+        pending = set()
+        try:
+            while not self._stopped.is_set():
+                missing = self.level - len(self.primes) - len(pending)
+                for _ in range(min(missing, self.workers - len(pending))):
+                    pending.add(
+                        executor.submit(
+                            _generate_task,
+                            self.kind,
+                            self.bits,
+                            self.e,
+                            self.confidence,
+                        )
+                    )
+
+                if not pending:
+                    self._wakeup.wait()
+                    self._wakeup.clear()
+                    continue
+
+                done, pending = concurrent.futures.wait(
+                    pending,
+                    timeout=0.1,
+                    return_when=concurrent.futures.FIRST_COMPLETED,
+                )
+                primes = [future.result() for future in done]
+                if primes:
+                    self._add([prime for prime in primes if prime is not None])
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def start(self):
+        """
+            Starts filling pool by worker processes in background
+        """
+        if self._thread is not None:
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+            Stops background filling, safe prime searches in progress are
+            given up and worker processes are joined
+        """
+        if self._thread is None:
+            return
+
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
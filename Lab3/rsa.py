@@ -1,6 +1,40 @@
+import math
 import random
 
 
+DEFAULT_EXPONENT = 65537
+
+# kind of primes made by generate_prime, see prime_pool
+RSA_PRIME = 0
+
+MILLER_RABIN_ROUNDS = 20
+
+SIEVE_LIMIT = 10000
+SIEVE_WINDOW = 4096
+
+_random = random.SystemRandom()
+
+
+def sieve_primes(limit):
+    """
+        Finds primes below limit with sieve of Eratosthenes
+
+    :param limit: upper bound
+    :return: list of primes
+    """
+    sieve = bytearray([1]) * limit
+    sieve[:2] = b"\x00\x00"
+
+    for n in range(2, int(limit ** 0.5) + 1):
+        if sieve[n]:
+            sieve[n * n :: n] = bytes(len(range(n * n, limit, n)))
+
+    return [n for n in range(limit) if sieve[n]]
+
+
+SMALL_PRIMES = sieve_primes(SIEVE_LIMIT)[1:]
+
+
 def get_primes(start, stop):
     if start >= stop:
         return []
@@ -75,6 +109,242 @@ def make_key_pair(length):
     return p * q, e, d
 
 
+def modular_inverse(a, modulus):
+    """
+        Finds x such that a * x % modulus == 1 with extended Euclidean
+        algorithm
+
+    :return: inverse of a
+    """
+    t, new_t = 0, 1
+    r, new_r = modulus, a % modulus
+    while new_r != 0:
+        quotient = r // new_r
+        t, new_t = new_t, t - quotient * new_t
+        r, new_r = new_r, r - quotient * new_r
+
+    if r != 1:
+        raise ValueError("{!r} is not invertible".format(a))
+
+    return t % modulus
+
+
+def is_probable_prime(n, rounds=MILLER_RABIN_ROUNDS):
+    """
+        Miller-Rabin primality test
+
+    :param n: number to test
+    :param rounds: number of random bases
+    :return: False if n is composite, True if it is prime with error
+        probability below 4 ** -rounds
+    """
+    if n < 2:
+        return False
+
+    for p in SMALL_PRIMES[:50]:
+        if n % p == 0:
+            return n == p
+    if n % 2 == 0:
+        return n == 2
+
+    s = 0
+    d = n - 1
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for _ in range(rounds):
+        x = pow(_random.randrange(2, n - 1), d, n)
+        if x == 1 or x == n - 1:
+            continue
+
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+
+    return True
+
+
+def generate_prime(bits, e=None):
+    """
+        Generates random prime of exactly passed bit length with two top
+        bits set, so product of two such primes has twice the length.
+        Windows of odd candidates are sieved by small primes first, only
+        survivors get Miller-Rabin test.
+
+    :param bits: bit length of prime
+    :param e: if passed, p - 1 must be coprime with it
+    :return: prime
+    """
+    while True:
+        start = _random.getrandbits(bits) | (3 << (bits - 2)) | 1
+
+        # window[i] stands for start + 2 * i
+        window = bytearray([1]) * SIEVE_WINDOW
+        for p in SMALL_PRIMES:
+            if p >= start:
+                break
+
+            # first i with start + 2 * i divisible by p, (p + 1) / 2 is
+            # inverse of 2 modulo p
+            i = -start * (p + 1) // 2 % p
+            window[i::p] = bytes(len(range(i, SIEVE_WINDOW, p)))
+
+        for i in range(SIEVE_WINDOW):
+            if not window[i]:
+                continue
+
+            candidate = start + 2 * i
+            if candidate.bit_length() != bits:
+                break
+
+            if e is not None and math.gcd(e, candidate - 1) != 1:
+                continue
+
+            if is_probable_prime(candidate):
+                return candidate
+
+
+class PrivateKey(object):
+    """
+        RSA private key keeping its primes, so private operation is done
+        with Chinese remainder theorem as exponentiations modulo every
+        prime, which are several times faster than one modulo n. Keys of
+        more than two primes are multi-prime keys of RFC 8017.
+    """
+
+    def __init__(self, primes, e=DEFAULT_EXPONENT):
+        if len(primes) < 2 or len(set(primes)) != len(primes):
+            raise ValueError("Key needs at least two distinct primes\n")
+
+        self.primes = tuple(primes)
+        self.p, self.q = self.primes[:2]
+        self.e = e
+
+        self.n = 1
+        phi = 1
+        for prime in self.primes:
+            self.n *= prime
+            phi *= prime - 1
+
+        self.d = modular_inverse(e, phi)
+        self.exponents = tuple(self.d % (prime - 1) for prime in self.primes)
+        self.d_p, self.d_q = self.exponents[:2]
+        self.q_inv = modular_inverse(self.q, self.p)
+
+        # for every other prime: product of previous primes and its inverse
+        self.coefficients = []
+        product = self.p * self.q
+        for prime in self.primes[2:]:
+            self.coefficients.append(
+                (product, modular_inverse(product, prime))
+            )
+            product *= prime
+
+    def public_key(self):
+        """
+        :return: n, e
+        """
+        return self.n, self.e
+
+    def power(self, value):
+        """
+            Raises value to d modulo n
+
+        :param value: integer less than n
+        :return: integer
+        """
+        m_1 = pow(value % self.p, self.d_p, self.p)
+        m_2 = pow(value % self.q, self.d_q, self.q)
+        result = m_2 + self.q * ((m_1 - m_2) * self.q_inv % self.p)
+
+        for prime, exponent, (product, inverse) in zip(
+            self.primes[2:], self.exponents[2:], self.coefficients
+        ):
+            m_i = pow(value % prime, exponent, prime)
+            result += product * ((m_i - result) * inverse % prime)
+
+        return result
+
+
+def generate_private_key(
+    length=2048, e=DEFAULT_EXPONENT, primes_number=2, pool=None
+):
+    """
+        Generates RSA private key of real size, e.g. 2048, 3072 or 4096 bits
+
+    :param length: bit length of modulus
+    :param e: public exponent
+    :param primes_number: number of primes, 3 or 4 make private operation
+        even faster
+    :param pool: prime_pool.PrimePool to take primes of its size from
+    :return: PrivateKey
+    """
+    if length < 8 * primes_number:
+        raise ValueError(
+            "cannot generate a key of length less "
+            "than {} (got {!r})".format(8 * primes_number, length)
+        )
+
+    if pool is not None and pool.kind != RSA_PRIME:
+        raise ValueError("Pool holds primes of another kind\n")
+
+    sizes = [length // primes_number] * primes_number
+    for i in range(length % primes_number):
+        sizes[i] += 1
+
+    while True:
+        primes = [
+            pool.get()
+            if pool is not None and pool.bits == size and pool.e == e
+            else generate_prime(size, e)
+            for size in sizes
+        ]
+        if len(set(primes)) != primes_number:
+            continue
+
+        key = PrivateKey(primes, e)
+        if key.n.bit_length() == length:
+            return key
+
+
+def generate_key_pair(length=2048, e=DEFAULT_EXPONENT, pool=None):
+    """
+        Generates RSA key pair of real size, e.g. 2048, 3072 or 4096 bits
+
+    :param length: bit length of modulus
+    :param e: public exponent
+    :param pool: prime_pool.PrimePool to take primes from
+    :return: n, e, d as make_key_pair
+    """
+    key = generate_private_key(length, e, pool=pool)
+
+    return key.n, key.e, key.d
+
+
+def sign(value, key):
+    """
+        Signs integer with private key
+
+    :param value: integer less than n
+    :param key: PrivateKey
+    :return: signature
+    """
+    return key.power(value)
+
+
+def verify(value, signature, e, n):
+    """
+        Checks signature of integer
+
+    :return: True if signature is valid
+    """
+    return pow(signature, e, n) == value % n
+
+
 def encrypt(data, e, n):
 
     if isinstance(data, str):
@@ -89,11 +359,22 @@ def encrypt(data, e, n):
     return encrypted_data
 
 
-def decrypt(data, d, n):
+def decrypt(data, d, n=None):
+    """
+        Decrypts values by one
+
+    :param data: encrypted values
+    :param d: private exponent, or PrivateKey to decrypt with CRT
+    :param n: modulus, not needed for PrivateKey
+    :return: decrypted string
+    """
     decrypted_data = []
 
     for byte in data:
-        decrypted_data.append(pow(byte, d, n))
+        if isinstance(d, PrivateKey):
+            decrypted_data.append(d.power(byte))
+        else:
+            decrypted_data.append(pow(byte, d, n))
 
     print(decrypted_data)
 
@@ -1,5 +1,84 @@
+import functools
+import io
 import random
 
+import Lab4.batch as batch
+import Lab4.codec as codec
+import Lab4.safe_prime as safe_prime
+
+
+# window bits of fixed base tables by group size. A table holds
+# 2 ** w * bits / w elements, so larger groups use smaller windows: tables
+# take about 2 MB at 1024 bits, 4 MB at 2048 and 6 MB at 4096 bits, still
+# 3-5 times faster than pow
+FIXED_BASE_WINDOWS = [(512, 8), (1024, 6), (2048, 5), (3072, 4), (None, 3)]
+
+# generator tables kept, keys of one group share the table of g
+FIXED_BASE_CACHE_SIZE = 4
+
+
+class FixedBase(object):
+    """
+        Precomputed powers of a fixed base: row i holds base ** (j << i * w)
+        for every w-bit digit j, so raising to exponent of n bits is n / w
+        multiplications by table entries without squarings.
+    """
+
+    def __init__(self, base, modulus, bits, window=None):
+        if window is None:
+            window = next(
+                window
+                for limit, window in FIXED_BASE_WINDOWS
+                if limit is None or bits <= limit
+            )
+
+        self.base = base
+        self.modulus = modulus
+        self.window = window
+        self.mask = (1 << window) - 1
+
+        self.rows = []
+        row_base = base % modulus
+        for _ in range((bits + window - 1) // window):
+            row = [1]
+            for _ in range(self.mask):
+                row.append(row[-1] * row_base % modulus)
+
+            self.rows.append(row)
+            row_base = row[-1] * row_base % modulus
+
+    def power(self, exponent):
+        """
+            Raises base to exponent modulo modulus
+
+        :param exponent: non-negative integer
+        :return: integer
+        """
+        if exponent.bit_length() > len(self.rows) * self.window:
+            return pow(self.base, exponent, self.modulus)
+
+        modulus = self.modulus
+        mask = self.mask
+        window = self.window
+
+        result = 1
+        for row in self.rows:
+            if not exponent:
+                break
+
+            digit = exponent & mask
+            if digit:
+                result = result * row[digit] % modulus
+
+            exponent >>= window
+
+        return result
+
+
+@functools.lru_cache(maxsize=FIXED_BASE_CACHE_SIZE)
+def _get_generator_table(g, p):
+    return FixedBase(g, p, p.bit_length())
+
 
 class PrivateKey(object):
     def __init__(self, p=None, g=None, x=None, num_bits=0):
@@ -16,6 +95,53 @@ class PublicKey(object):
         self.y = y
         self.num_bits = num_bits
 
+        self._g_table = None
+        self._y_table = None
+
+        # ephemeral.EphemeralPool attached to this key
+        self.ephemeral_pool = None
+
+    def g_power(self, k):
+        """
+            Computes g ** k mod p with fixed base table of the group, built
+            on first call and shared with other keys of the same group
+        """
+        if self._g_table is None:
+            self._g_table = _get_generator_table(self.g, self.p)
+
+        return self._g_table.power(k)
+
+    def y_power(self, k):
+        """
+            Computes y ** k mod p with fixed base table built on first call
+        """
+        if self._y_table is None:
+            self._y_table = FixedBase(self.y, self.p, self.p.bit_length())
+
+        return self._y_table.power(k)
+
+    def make_ephemeral(self):
+        """
+            Chooses random k and computes ephemeral pair
+
+        :return: g ** k mod p, y ** k mod p
+        """
+        k = random.randint(2, self.p - 1)
+
+        return self.g_power(k), self.y_power(k)
+
+    def ephemeral(self):
+        """
+            Takes precomputed ephemeral pair from attached pool, or computes
+            it if there is no pool
+
+        :return: g ** k mod p, y ** k mod p
+        """
+        if self.ephemeral_pool is not None:
+            return self.ephemeral_pool.get()
+
+        return self.make_ephemeral()
+
 
 def greatest_common_denominator(a, b):
     while b != 0:
@@ -84,24 +210,45 @@ def find_primitive_root(p):
                 return g
 
 
-def find_prime(num_bits, confidence):
-    while 1:
-        p = random.randint(2 ** (num_bits - 2), 2 ** (num_bits - 1))
-
-        while not solovay_strassen_primality_test(p, confidence):
-            p = random.randint(2 ** (num_bits - 2), 2 ** (num_bits - 1))
-            while p % 2 == 0:
-                p = random.randint(2 ** (num_bits - 2), 2 ** (num_bits - 1))
-
-        p = p * 2 + 1
-        if solovay_strassen_primality_test(p, confidence):
-            return p
+def find_prime(num_bits, confidence, workers=None):
+    """
+        Finds safe prime p = 2q + 1, see safe_prime.generate_safe_prime
+
+    :param num_bits: bit length of p
+    :param confidence: Miller-Rabin rounds for q
+    :param workers: number of processes
+    :return: safe prime
+    """
+    return safe_prime.generate_safe_prime(num_bits, confidence, workers)
+
+
+def generate_keys(num_bits=256, confidence=32, pool=None, store=None):
+    """
+        Generates key pair over safe prime group
+
+    :param num_bits: size of prime
+    :param confidence: number of primality test rounds
+    :param pool: Lab3.prime_pool.PrimePool of safe primes to take the prime
+        from instead of searching it
+    :param store: groups.GroupStore to take shared p and g from, so only x
+        and y are generated
+    :return: dict with "private_key" and "public_key"
+    """
+    if store is not None:
+        p, g = store.get(num_bits, confidence=confidence)
+    else:
+        if pool is not None:
+            if pool.kind != safe_prime.SAFE_PRIME:
+                raise ValueError("Pool holds primes of another kind\n")
 
+            if pool.bits != num_bits:
+                raise ValueError("Pool holds primes of another size\n")
 
-def generate_keys(num_bits=256, confidence=32):
-    p = find_prime(num_bits, confidence)
-    g = find_primitive_root(p)
-    g = modexp(g, 2, p)
+            p = pool.get()
+        else:
+            p = find_prime(num_bits, confidence)
+        g = find_primitive_root(p)
+        g = modexp(g, 2, p)
     x = random.randint(2, p - 1)
     y = modexp(g, x, p)
 
@@ -111,38 +258,100 @@ def generate_keys(num_bits=256, confidence=32):
     return {"private_key": private_key, "public_key": public_key}
 
 
-def encrypt(key, plain_text):
-    z = bytearray(plain_text, "utf-8")
+def encrypt_pairs(key, plain_text):
+    """
+        Encrypts every UTF-8 byte of text as (a, b) pair
+
+    :param key: PublicKey
+    :param plain_text: string or its UTF-8 bytes
+    :return: list of (a, b)
+    """
+    if isinstance(plain_text, str):
+        z = bytearray(plain_text, "utf-8")
+    else:
+        z = plain_text
 
     cipher_pairs = []
     for i in z:
-        k = random.randint(2, key.p - 1)
-        a = modexp(key.g, k, key.p)
-        b = (i * modexp(key.y, k, key.p)) % key.p
-        cipher_pairs.append([a, b])
+        a, s = key.ephemeral()
+        b = (i * s) % key.p
+        cipher_pairs.append((a, b))
 
-    encrypted_str = ""
-    for pair in cipher_pairs:
-        encrypted_str += str(pair[0]) + " " + str(pair[1]) + " "
+    return cipher_pairs
+
+
+def encrypt(key, plain_text):
+    """
+        Encrypts text to legacy decimal text format, see encrypt_binary
+    """
+    encrypted_str = "".join(
+        str(pair[0]) + " " + str(pair[1]) + " "
+        for pair in encrypt_pairs(key, plain_text)
+    )
 
     return encrypted_str
 
 
-def decrypt(key, cipher):
-    plain_text = []
+def encrypt_binary(key, plain_text, file=None):
+    """
+        Encrypts text to binary ciphertext of codec, frame by frame
+
+    :param key: PublicKey
+    :param plain_text: string
+    :param file: binary file object to write to
+    :return: ciphertext bytes if file is not passed
+    """
+    output = io.BytesIO() if file is None else file
+    writer = codec.Writer(output, key.p)
+
+    z = plain_text.encode("utf-8")
+    for start in range(0, len(z), codec.MAX_FRAME_PAIRS):
+        writer.write(
+            encrypt_pairs(key, z[start : start + codec.MAX_FRAME_PAIRS])
+        )
+    writer.close()
+
+    if file is None:
+        return output.getvalue()
 
-    cipher_array = cipher.split()
-    if not len(cipher_array) % 2 == 0:
-        return "Malformed Cipher Text"
-    for i in range(0, len(cipher_array), 2):
-        a = int(cipher_array[i])
-        b = int(cipher_array[i + 1])
 
-        s = modexp(a, key.x, key.p)
-        plain = (b * modexp(s, key.p - 2, key.p)) % key.p
-        plain_text.append(plain)
+def decrypt_pairs(key, pairs):
+    """
+        Decrypts pairs of encrypt_pairs
+
+    :param key: PrivateKey
+    :param pairs: list of (a, b)
+    :return: list of byte values
+    """
+    # a ** (p - 1 - x) is inverse of shared a ** x
+    return batch.decrypt_chunk(key.p, key.x, pairs)
+
+
+def decrypt(key, cipher):
+    """
+        Decrypts binary ciphertext of encrypt_binary, or legacy text of
+        encrypt
+
+    :param key: PrivateKey
+    :param cipher: bytes, memoryview or mmap with binary ciphertext, binary
+        file object to read it from, or legacy text string
+    :return: decrypted text
+    """
+    if isinstance(cipher, str):
+        try:
+            frames = [codec.read_text(cipher)]
+        except ValueError:
+            return "Malformed Cipher Text"
+    elif hasattr(cipher, "read"):
+        frames = codec.iter_read(cipher)
+    else:
+        frames = codec.iter_loads(cipher)
+
+    plain_text = bytearray()
+    for pairs in frames:
+        plain_text += bytearray(decrypt_pairs(key, pairs))
 
-    decrypted_text = bytearray(plain_text).decode("utf-8")
+    decrypted_text = plain_text.decode("utf-8")
 
     return decrypted_text
 
@@ -0,0 +1,94 @@
+import concurrent.futures
+import functools
+
+
+DEFAULT_CHUNK_SIZE = 1024
+
+
+def batch_inverse(values, p):
+    """
+        Inverts all values modulo p with one exponentiation by Montgomery's
+        trick: prefix products are inverted once and unwound back
+
+    :param values: non-zero integers modulo p
+    :param p: prime
+    :return: list of inverses
+    """
+    if not values:
+        return []
+
+    prefix = []
+    product = 1
+    for value in values:
+        product = product * value % p
+        prefix.append(product)
+
+    inverse = pow(product, p - 2, p)
+
+    inverses = [0] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        inverses[i] = inverse * prefix[i - 1] % p
+        inverse = inverse * values[i] % p
+    inverses[0] = inverse
+
+    return inverses
+
+
+def decrypt_chunk(p, x, pairs):
+    """
+        Decrypts pairs with one exponentiation each: a ** (p - 1 - x) is
+        the inverse of shared element a ** x
+
+    :param p: group prime
+    :param x: private exponent
+    :param pairs: list of (a, b)
+    :return: list of plain elements
+    """
+    exponent = (p - 1 - x) % (p - 1)
+
+    return [b * pow(a, exponent, p) % p for a, b in pairs]
+
+
+def decrypt_shared(shared, pairs, p):
+    """
+        Decrypts pairs whose shared elements a ** x are already known,
+        all of them are inverted together by batch_inverse
+
+    :param shared: list of a ** x mod p
+    :param pairs: list of (a, b)
+    :param p: group prime
+    :return: list of plain elements
+    """
+    return [
+        b * inverse % p
+        for (_, b), inverse in zip(pairs, batch_inverse(shared, p))
+    ]
+
+
+def decrypt_pairs(key, pairs, workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+        Decrypts many pairs, large batches may be split between processes
+
+    :param key: al_gamal.PrivateKey
+    :param pairs: list of (a, b)
+    :param workers: number of processes, 1 to decrypt in this process,
+        None for number of CPUs
+    :param chunk_size: number of pairs in one worker task
+    :return: list of plain elements
+    """
+    if workers == 1 or len(pairs) <= chunk_size:
+        return decrypt_chunk(key.p, key.x, pairs)
+
+    chunks = [
+        pairs[start : start + chunk_size]
+        for start in range(0, len(pairs), chunk_size)
+    ]
+
+    elements = []
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        for result in executor.map(
+            functools.partial(decrypt_chunk, key.p, key.x), chunks
+        ):
+            elements.extend(result)
+
+    return elements
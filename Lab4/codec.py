@@ -0,0 +1,222 @@
+import struct
+
+
+MAGIC = b"EG"
+VERSION = 1
+
+# magic, version, element width
+HEADER = struct.Struct(">2sBH")
+# number of pairs in frame
+FRAME_HEADER = struct.Struct(">I")
+
+MAX_FRAME_PAIRS = 1 << 16
+
+
+def element_width(p):
+    """
+    :param p: group prime
+    :return: bytes number of one element
+    """
+    return (p.bit_length() + 7) // 8
+
+
+def encode_header(width):
+    return HEADER.pack(MAGIC, VERSION, width)
+
+
+def decode_header(data):
+    """
+        Parses stream header
+
+    :param data: HEADER.size bytes
+    :return: element width
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Ciphertext is too short\n")
+
+    magic, version, width = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a binary ElGamal ciphertext\n")
+
+    return width
+
+
+def encode_pairs(pairs, width):
+    """
+        Serializes pairs as one frame: pairs number, then a and b of every
+        pair as width bytes big-endian
+
+    :param pairs: list of (a, b)
+    :param width: element width
+    :return: bytes
+    """
+    frame = bytearray(FRAME_HEADER.pack(len(pairs)))
+    for a, b in pairs:
+        frame += a.to_bytes(width, "big")
+        frame += b.to_bytes(width, "big")
+
+    return bytes(frame)
+
+
+def decode_pairs(data, width):
+    """
+        Parses pairs without frame header
+
+    :param data: bytes or memoryview of 2 * width bytes per pair
+    :param width: element width
+    :return: list of (a, b)
+    """
+    data = memoryview(data)
+    if len(data) % (2 * width) != 0:
+        raise ValueError(
+            "Invalid data length, data must be a multiple of "
+            + str(2 * width)
+            + " bytes\n"
+        )
+
+    from_bytes = int.from_bytes
+    return [
+        (
+            from_bytes(data[start : start + width], "big"),
+            from_bytes(data[start + width : start + 2 * width], "big"),
+        )
+        for start in range(0, len(data), 2 * width)
+    ]
+
+
+def dumps(pairs, p):
+    """
+        Serializes pairs to binary ciphertext
+
+    :param pairs: list of (a, b)
+    :param p: group prime
+    :return: bytes
+    """
+    width = element_width(p)
+
+    data = bytearray(encode_header(width))
+    for start in range(0, len(pairs), MAX_FRAME_PAIRS):
+        data += encode_pairs(pairs[start : start + MAX_FRAME_PAIRS], width)
+
+    return bytes(data)
+
+
+def iter_loads(data):
+    """
+        Parses binary ciphertext from bytes or memoryview without copying
+
+    :param data: bytes, bytearray, mmap or memoryview
+    :return: generator of (a, b) lists, one per frame
+    """
+    data = memoryview(data)
+    width = decode_header(data)
+
+    position = HEADER.size
+    while position < len(data):
+        if len(data) - position < FRAME_HEADER.size:
+            raise ValueError("Ciphertext is truncated\n")
+
+        (count,) = FRAME_HEADER.unpack_from(data, position)
+        position += FRAME_HEADER.size
+
+        end = position + count * 2 * width
+        if end > len(data):
+            raise ValueError("Ciphertext is truncated\n")
+
+        yield decode_pairs(data[position:end], width)
+        position = end
+
+
+def loads(data):
+    """
+        Parses binary ciphertext
+
+    :param data: bytes, bytearray, mmap or memoryview
+    :return: list of (a, b)
+    """
+    pairs = []
+    for frame in iter_loads(data):
+        pairs.extend(frame)
+
+    return pairs
+
+
+class Writer(object):
+    """
+        Writes binary ciphertext to file object frame by frame
+    """
+
+    def __init__(self, file, p):
+        self.file = file
+        self.width = element_width(p)
+        self._header_written = False
+
+    def write(self, pairs):
+        """
+            Writes pairs as one or more frames
+
+        :param pairs: list of (a, b)
+        """
+        if not self._header_written:
+            self.file.write(encode_header(self.width))
+            self._header_written = True
+
+        for start in range(0, len(pairs), MAX_FRAME_PAIRS):
+            self.file.write(
+                encode_pairs(
+                    pairs[start : start + MAX_FRAME_PAIRS], self.width
+                )
+            )
+
+    def close(self):
+        """
+            Writes header if no pairs were written, file is left open
+        """
+        if not self._header_written:
+            self.write([])
+
+
+def _read_exactly(file, size):
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError("Ciphertext is truncated\n")
+
+    return data
+
+
+def iter_read(file):
+    """
+        Reads binary ciphertext from file object frame by frame
+
+    :param file: binary file object
+    :return: generator of (a, b) lists, one per frame
+    """
+    width = decode_header(file.read(HEADER.size))
+
+    while True:
+        frame_header = file.read(FRAME_HEADER.size)
+        if not frame_header:
+            return
+
+        if len(frame_header) != FRAME_HEADER.size:
+            raise ValueError("Ciphertext is truncated\n")
+
+        (count,) = FRAME_HEADER.unpack(frame_header)
+        yield decode_pairs(_read_exactly(file, count * 2 * width), width)
+
+
+def read_text(cipher):
+    """
+        Reads legacy text ciphertext of al_gamal.encrypt
+
+    :param cipher: string of numbers separated by spaces
+    :return: list of (a, b)
+    """
+    numbers = cipher.split()
+    if len(numbers) % 2 != 0:
+        raise ValueError("Malformed Cipher Text\n")
+
+    return [
+        (int(numbers[i]), int(numbers[i + 1]))
+        for i in range(0, len(numbers), 2)
+    ]
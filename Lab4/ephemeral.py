@@ -0,0 +1,127 @@
+import collections
+import threading
+
+
+DEFAULT_SIZE = 1024
+DEFAULT_LOW_WATERMARK = 256
+
+
+class EphemeralPool(object):
+    """
+        Precomputed ephemeral pairs (g ** k, y ** k) of a public key. Pairs
+        do not depend on the message, so a background thread makes them
+        ahead and encryption only multiplies. The thread refills the pool up
+        to size whenever it drops below low_watermark; an empty pool makes
+        pairs on demand.
+    """
+
+    def __init__(
+        self, key, size=DEFAULT_SIZE, low_watermark=DEFAULT_LOW_WATERMARK
+    ):
+        if not 0 <= low_watermark <= size:
+            raise ValueError("Low watermark must be between 0 and size\n")
+
+        self.key = key
+        self.size = size
+        self.low_watermark = low_watermark
+
+        self.pairs = collections.deque()
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _generate(self):
+        self.generated += 1
+        return self.key.make_ephemeral()
+
+    def get(self):
+        """
+            Takes a pair, every pair is given out once
+
+        :return: g ** k mod p, y ** k mod p
+        """
+        try:
+            pair = self.pairs.popleft()
+            self.hits += 1
+        except IndexError:
+            pair = None
+            self.misses += 1
+
+        if len(self.pairs) < self.low_watermark:
+            self._wakeup.set()
+
+        if pair is None:
+            return self._generate()
+
+        return pair
+
+    def fill(self):
+        """
+            Fills pool up to size in this thread
+        """
+        while len(self.pairs) < self.size and not self._stopped.is_set():
+            self.pairs.append(self._generate())
+
+    def metrics(self):
+        """
+        :return: dict with pool "size", "hits", "misses", "hit_rate" and
+            "generated" pairs number
+        """
+        requests = self.hits + self.misses
+
+        return {
+            "size": len(self.pairs),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / requests if requests else 0.0,
+            "generated": self.generated,
+        }
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.fill()
+
+            self._wakeup.wait()
+            self._wakeup.clear()
+
+    def start(self):
+        """
+            Attaches pool to its key and starts filling it in background
+        """
+        self.key.ephemeral_pool = self
+
+        if self._thread is not None:
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+            Stops background filling and detaches pool from its key
+        """
+        if self.key.ephemeral_pool is self:
+            self.key.ephemeral_pool = None
+
+        if self._thread is None:
+            return
+
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
@@ -0,0 +1,245 @@
+import json
+import os
+import threading
+
+import Lab4.al_gamal as al_gamal
+import Lab4.safe_prime as safe_prime
+
+
+# Miller-Rabin rounds to check groups read from cache file
+VALIDATION_ROUNDS = 16
+
+# RFC 3526 group 5
+MODP_1536 = int(
+    "FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74"
+    "020BBEA63B139B22514A08798E3404DDEF9519B3CD3A431B302B0A6DF25F1437"
+    "4FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED"
+    "EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF05"
+    "98DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208552BB"
+    "9ED529077096966D670C354E4ABC9804F1746C08CA237327FFFFFFFFFFFFFFFF",
+    16,
+)
+
+# RFC 3526 group 14
+MODP_2048 = int(
+    "FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74"
+    "020BBEA63B139B22514A08798E3404DDEF9519B3CD3A431B302B0A6DF25F1437"
+    "4FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED"
+    "EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF05"
+    "98DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208552BB"
+    "9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3B"
+    "E39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF695581718"
+    "3995497CEA956AE515D2261898FA051015728E5A8AACAA68FFFFFFFFFFFFFFFF",
+    16,
+)
+
+# RFC 3526 group 15
+MODP_3072 = int(
+    "FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74"
+    "020BBEA63B139B22514A08798E3404DDEF9519B3CD3A431B302B0A6DF25F1437"
+    "4FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED"
+    "EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF05"
+    "98DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208552BB"
+    "9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3B"
+    "E39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF695581718"
+    "3995497CEA956AE515D2261898FA051015728E5A8AAAC42DAD33170D04507A33"
+    "A85521ABDF1CBA64ECFB850458DBEF0A8AEA71575D060C7DB3970F85A6E1E4C7"
+    "ABF5AE8CDB0933D71E8C94E04A25619DCEE3D2261AD2EE6BF12FFA06D98A0864"
+    "D87602733EC86A64521F2B18177B200CBBE117577A615D6C770988C0BAD946E2"
+    "08E24FA074E5AB3143DB5BFCE0FD108E4B82D120A93AD2CAFFFFFFFFFFFFFFFF",
+    16,
+)
+
+# RFC 3526 group 16
+MODP_4096 = int(
+    "FFFFFFFFFFFFFFFFC90FDAA22168C234C4C6628B80DC1CD129024E088A67CC74"
+    "020BBEA63B139B22514A08798E3404DDEF9519B3CD3A431B302B0A6DF25F1437"
+    "4FE1356D6D51C245E485B576625E7EC6F44C42E9A637ED6B0BFF5CB6F406B7ED"
+    "EE386BFB5A899FA5AE9F24117C4B1FE649286651ECE45B3DC2007CB8A163BF05"
+    "98DA48361C55D39A69163FA8FD24CF5F83655D23DCA3AD961C62F356208552BB"
+    "9ED529077096966D670C354E4ABC9804F1746C08CA18217C32905E462E36CE3B"
+    "E39E772C180E86039B2783A2EC07A28FB5C55DF06F4C52C9DE2BCBF695581718"
+    "3995497CEA956AE515D2261898FA051015728E5A8AAAC42DAD33170D04507A33"
+    "A85521ABDF1CBA64ECFB850458DBEF0A8AEA71575D060C7DB3970F85A6E1E4C7"
+    "ABF5AE8CDB0933D71E8C94E04A25619DCEE3D2261AD2EE6BF12FFA06D98A0864"
+    "D87602733EC86A64521F2B18177B200CBBE117577A615D6C770988C0BAD946E2"
+    "08E24FA074E5AB3143DB5BFCE0FD108E4B82D120A92108011A723C12A787E6D7"
+    "88719A10BDBA5B2699C327186AF4E23C1A946834B6150BDA2583E9CA2AD44CE8"
+    "DBBBC2DB04DE8EF92E8EFC141FBECAA6287C59474E6BC05D99B2964FA090C3A2"
+    "233BA186515BE7ED1F612970CEE2D7AFB81BDD762170481CD0069127D5B05AA9"
+    "93B4EA988D8FDDC186FFB7DC90A6C08F4DF435C934063199FFFFFFFFFFFFFFFF",
+    16,
+)
+
+
+# generator 2 is a quadratic residue for these primes, as p = 7 mod 8, so it
+# generates subgroup of prime order q = (p - 1) / 2 like generate_keys g
+MODP_GROUPS = {
+    1536: (MODP_1536, 2),
+    2048: (MODP_2048, 2),
+    3072: (MODP_3072, 2),
+    4096: (MODP_4096, 2),
+}
+
+
+def _cache_directory():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+
+    return os.path.join(base, "mzi")
+
+
+def default_path():
+    """
+    :return: path of group cache file in user cache directory
+    """
+    return os.path.join(_cache_directory(), "groups.json")
+
+
+def is_valid_group(p, g, rounds=VALIDATION_ROUNDS):
+    """
+        Checks that p is safe prime and g generates subgroup of order
+        q = (p - 1) / 2
+
+    :return: True if group is valid
+    """
+    q = (p - 1) // 2
+    if p % 4 != 3 or not 1 < g < p - 1 or pow(g, q, p) != 1:
+        return False
+
+    return safe_prime.is_safe_prime(q, rounds)
+
+
+def generate_group(num_bits, confidence=32, workers=None):
+    """
+        Generates new group like generate_keys does
+
+    :param num_bits: bit length of p
+    :param confidence: Miller-Rabin rounds
+    :param workers: number of processes for prime search
+    :return: p, g
+    """
+    p = al_gamal.find_prime(num_bits, confidence, workers)
+    g = pow(al_gamal.find_primitive_root(p), 2, p)
+
+    return p, g
+
+
+class GroupStore(object):
+    """
+        Group parameters by prime size. RFC 3526 groups are used for their
+        sizes, other sizes are generated once and kept in cache file, so a
+        new key pair only needs new x and y. Groups read from the file are
+        validated on first use, as anyone able to write it could put weak
+        parameters there.
+    """
+
+    def __init__(self, path=None, well_known=True):
+        self.path = default_path() if path is None else path
+        self.well_known = well_known
+
+        self.groups = {}
+        self._validated = set()
+        self._lock = threading.Lock()
+
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        with open(self.path, "r") as file:
+            state = json.load(file)
+
+        for group in state["groups"]:
+            self.groups[group["bits"]] = (
+                int(group["p"], 16),
+                int(group["g"], 16),
+            )
+
+    def _save(self):
+        if not self.path:
+            return
+
+        state = {
+            "groups": [
+                {"bits": bits, "p": format(p, "x"), "g": format(g, "x")}
+                for bits, (p, g) in sorted(self.groups.items())
+            ]
+        }
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(state, file)
+
+        os.replace(temporary_path, self.path)
+
+    def add(self, p, g):
+        """
+            Adds group and saves it to cache file
+
+        :param p: safe prime
+        :param g: generator of subgroup of order (p - 1) / 2
+        """
+        if not is_valid_group(p, g):
+            raise ValueError("Invalid group parameters\n")
+
+        with self._lock:
+            self.groups[p.bit_length()] = (p, g)
+            self._validated.add(p.bit_length())
+            self._save()
+
+    def get(self, num_bits, generate=True, confidence=32, workers=None):
+        """
+            Returns group of passed size
+
+        :param num_bits: bit length of p
+        :param generate: generate and cache group if there is none
+        :param confidence: Miller-Rabin rounds for generated prime
+        :param workers: number of processes for prime search
+        :return: p, g or None if there is no group and generate is False
+        """
+        if self.well_known and num_bits in MODP_GROUPS:
+            return MODP_GROUPS[num_bits]
+
+        with self._lock:
+            group = self.groups.get(num_bits)
+            if group is not None and num_bits not in self._validated:
+                if not is_valid_group(*group):
+                    raise ValueError(
+                        "Invalid group of "
+                        + str(num_bits)
+                        + " bits in "
+                        + self.path
+                        + "\n"
+                    )
+
+                self._validated.add(num_bits)
+
+        if group is not None or not generate:
+            return group
+
+        group = generate_group(num_bits, confidence, workers)
+        self.add(*group)
+
+        return group
+
+
+_default_store = None
+
+
+def get_default_store():
+    """
+    :return: GroupStore with default cache file
+    """
+    global _default_store
+
+    if _default_store is None:
+        _default_store = GroupStore()
+
+    return _default_store
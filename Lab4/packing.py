@@ -0,0 +1,163 @@
+import hashlib
+
+import Lab1.des.modes as modes
+import Lab4.batch as batch
+
+
+DES_KEY_SIZE = 8
+NONCE_SIZE = modes.BLOCK_SIZE
+
+
+def _element_size(p):
+    return (p.bit_length() + 7) // 8
+
+
+def block_size(p):
+    """
+        Number of message bytes packed into one group element. Block value
+        plus one must not exceed q = (p - 1) / 2.
+
+    :param p: safe prime
+    :return: bytes number
+    """
+    return (((p - 1) // 2).bit_length() - 1) // 8
+
+
+def encode_element(m, p):
+    """
+        Maps 1 <= m <= q into subgroup of quadratic residues generated by g.
+        For safe prime p = 3 mod 4, so -1 is not a residue and exactly one
+        of m and p - m is.
+
+    :return: group element
+    """
+    q = (p - 1) // 2
+    if pow(m, q, p) == 1:
+        return m
+
+    return p - m
+
+
+def decode_element(x, p):
+    """
+        Inverse of encode_element
+    """
+    if x <= (p - 1) // 2:
+        return x
+
+    return p - x
+
+
+def add_padding_to_data(data, size):
+    """
+        Pads data with 0x80 byte and zeros to multiple of size, so padding
+        is removed without knowing data length
+    """
+    data = data + b"\x80"
+    return data + bytes(-len(data) % size)
+
+
+def remove_padding_from_data(data):
+    stripped = data.rstrip(b"\x00")
+    if not stripped.endswith(b"\x80"):
+        raise ValueError("Invalid padding\n")
+
+    return stripped[:-1]
+
+
+def encrypt(key, data):
+    """
+        Encrypts data packing block_size bytes into every group element, so
+        each pair (a, b) carries a block instead of a byte
+
+    :param key: al_gamal.PublicKey
+    :param data: bytes or string
+    :return: list of (a, b) pairs
+    """
+    if isinstance(data, str):
+        data = data.encode("utf8")
+
+    size = block_size(key.p)
+    if size < 1:
+        raise ValueError("Group is too small for block mode\n")
+
+    data = add_padding_to_data(data, size)
+
+    pairs = []
+    for start in range(0, len(data), size):
+        m = int.from_bytes(data[start : start + size], "big") + 1
+
+        a, s = key.ephemeral()
+        pairs.append((a, encode_element(m, key.p) * s % key.p))
+
+    return pairs
+
+
+def decrypt(key, pairs, workers=1):
+    """
+        Decrypts pairs made by encrypt
+
+    :param key: al_gamal.PrivateKey
+    :param pairs: list of (a, b) pairs
+    :param workers: number of processes for batch.decrypt_pairs
+    :return: decrypted bytes
+    """
+    size = block_size(key.p)
+
+    data = bytearray()
+    for x in batch.decrypt_pairs(key, pairs, workers):
+        m = decode_element(x, key.p) - 1
+        if not 0 <= m < 1 << (8 * size):
+            raise ValueError("Decryption error\n")
+
+        data += m.to_bytes(size, "big")
+
+    return remove_padding_from_data(bytes(data))
+
+
+def _derive_key(shared, p):
+    digest = hashlib.sha256(shared.to_bytes(_element_size(p), "big")).digest()
+
+    return (
+        digest[:DES_KEY_SIZE],
+        digest[DES_KEY_SIZE : DES_KEY_SIZE + NONCE_SIZE],
+    )
+
+
+def hybrid_encrypt(key, data):
+    """
+        Encrypts data of any size with DES in CTR mode under key derived
+        from ephemeral shared element y ** k, only g ** k is sent with data
+
+    :param key: al_gamal.PublicKey
+    :param data: bytes or string
+    :return: a as element size bytes followed by encrypted data
+    """
+    if isinstance(data, str):
+        data = data.encode("utf8")
+
+    a, shared = key.ephemeral()
+    des_key, nonce = _derive_key(shared, key.p)
+
+    return a.to_bytes(_element_size(key.p), "big") + modes.ctr_crypt(
+        data, des_key, nonce
+    )
+
+
+def hybrid_decrypt(key, encrypted_data):
+    """
+        Decrypts data encrypted by hybrid_encrypt
+
+    :param key: al_gamal.PrivateKey
+    :param encrypted_data: encrypted bytes
+    :return: decrypted bytes
+    """
+    size = _element_size(key.p)
+
+    a = int.from_bytes(encrypted_data[:size], "big")
+    if not 1 < a < key.p - 1:
+        raise ValueError("Decryption error\n")
+
+    des_key, nonce = _derive_key(pow(a, key.x, key.p), key.p)
+
+    return modes.ctr_crypt(encrypted_data[size:], des_key, nonce)
@@ -0,0 +1,173 @@
+import concurrent.futures
+import multiprocessing
+import os
+import random
+
+import Lab3.rsa as rsa
+
+
+# kind of primes made by generate_safe_prime, see Lab3.prime_pool
+SAFE_PRIME = 1
+
+SIEVE_LIMIT = 1 << 16
+SIEVE_WINDOW = 1 << 14
+
+# smaller primes are found faster in this process than processes start
+PARALLEL_THRESHOLD = 1024
+
+WINDOWS_PER_TASK = 4
+
+SMALL_PRIMES = rsa.sieve_primes(SIEVE_LIMIT)[1:]
+
+_random = random.SystemRandom()
+
+# event set when worker processes must give up their search
+_stop = None
+
+
+def sieve_window(start, size=SIEVE_WINDOW):
+    """
+        Sieves candidates q = start + 2 * i for q and 2q + 1 together: q is
+        struck out if it or 2q + 1 is divisible by a small prime
+
+    :param start: odd number
+    :param size: number of candidates
+    :return: bytearray with 1 for candidates left
+    """
+    window = bytearray([1]) * size
+    for p in SMALL_PRIMES:
+        if p >= start:
+            break
+
+        # (p + 1) / 2 is inverse of 2 modulo p
+        half = (p + 1) // 2
+        # q = 0 mod p
+        i = -start * half % p
+        window[i::p] = bytes(len(range(i, size, p)))
+        # 2q + 1 = 0 mod p, so q = (p - 1) / 2 mod p
+        i = ((p - 1) // 2 - start) * half % p
+        window[i::p] = bytes(len(range(i, size, p)))
+
+    return window
+
+
+def is_safe_prime(q, confidence):
+    """
+        Tests q and p = 2q + 1. Fermat tests to base 2 drop almost all
+        composites with one exponentiation each, then q gets Miller-Rabin
+        rounds. By Pocklington criterion 2 ** (p - 1) = 1 mod p with prime q
+        proves p prime, as 2 ** 2 - 1 = 3 does not divide p.
+
+    :param q: odd number not divisible by 3
+    :param confidence: Miller-Rabin rounds for q
+    :return: True if 2q + 1 is safe prime
+    """
+    p = 2 * q + 1
+    if pow(2, q - 1, q) != 1 or pow(2, p - 1, p) != 1:
+        return False
+
+    return rsa.is_probable_prime(q, confidence)
+
+
+def search(bits, confidence, windows=WINDOWS_PER_TASK, stop=None):
+    """
+        Searches safe prime in few random windows
+
+    :param bits: bit length of safe prime
+    :param confidence: Miller-Rabin rounds
+    :param windows: number of windows to try, None to search until found
+    :param stop: event checked before every test, search gives up when it
+        is set
+    :return: safe prime or None if windows had none or search was stopped
+    """
+    tried = 0
+    while windows is None or tried < windows:
+        tried += 1
+
+        # q of bits - 1 bits with top bit set, so p has exactly bits bits
+        start = _random.getrandbits(bits - 1) | (1 << (bits - 2)) | 1
+        window = sieve_window(start)
+
+        for i in range(len(window)):
+            if not window[i]:
+                continue
+
+            q = start + 2 * i
+            if q.bit_length() != bits - 1:
+                break
+
+            if stop is not None and stop.is_set():
+                return None
+
+            if is_safe_prime(q, confidence):
+                return 2 * q + 1
+
+    return None
+
+
+def init_worker(stop):
+    """
+        Initializer of worker processes, stop is shared multiprocessing event
+    """
+    global _stop
+
+    _stop = stop
+
+
+def search_task(bits, confidence, windows=WINDOWS_PER_TASK):
+    """
+        Worker task: search stopped by event passed to init_worker
+    """
+    return search(bits, confidence, windows, _stop)
+
+
+def generate_safe_prime(bits, confidence=32, workers=None):
+    """
+        Generates safe prime p = 2q + 1 with prime q. Worker processes
+        search random windows, the first found prime is returned.
+
+    :param bits: bit length of p
+    :param confidence: Miller-Rabin rounds for q
+    :param workers: number of processes, 1 to search in this process, by
+        default number of CPUs for primes of PARALLEL_THRESHOLD bits and more
+    :return: safe prime
+    """
+    if bits < 8:
+        raise ValueError(
+            "cannot generate a safe prime of length less "
+            "than 8 (got {!r})".format(bits)
+        )
+
+    if workers is None:
+        workers = os.cpu_count() or 1 if bits >= PARALLEL_THRESHOLD else 1
+
+    if workers == 1:
+        while True:
+            prime = search(bits, confidence)
+            if prime is not None:
+                return prime
+
+    # workers check the event between candidates, so none of them keeps
+    # searching after the first prime is found
+    stop = multiprocessing.Event()
+    executor = concurrent.futures.ProcessPoolExecutor(
+        workers, initializer=init_worker, initargs=(stop,)
+    )
+    try:
+        pending = {
+            executor.submit(search_task, bits, confidence)
+            for _ in range(workers)
+        }
+        while True:
+            done, pending = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                prime = future.result()
+                if prime is not None:
+                    return prime
+
+                pending.add(executor.submit(search_task, bits, confidence))
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)